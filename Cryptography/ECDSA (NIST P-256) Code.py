@@ -1,19 +1,150 @@
+from collections import OrderedDict
+
 print("---- ECDSA with NIST P-256 ----\n")
 
+# Montgomery's trick: the inverses of all values mod n with a single inverse_mod
+def batch_inverse(values, n):
+    if not values:
+        return []
+    prefix = []
+    acc = 1
+    for v in values:
+        acc = acc * v % n
+        prefix.append(acc)
+    inv = inverse_mod(acc, n)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = inv * prefix[i-1] % n
+        inv = inv * values[i] % n
+    inverses[0] = inv
+    return inverses
+
+# Curve context: the domain parameters with the published order n (G.order() would
+# count points on every run) and a fixed-base table of multiples of G, built once and
+# reused so that every d*G and k*G is a handful of table lookups and additions.
+# Public keys that sign repeatedly get a table of their own, kept in an LRU cache.
+class CurveContext:
+    def __init__(self, name, p, a, b, Gx, Gy, n, window=8, key_window=4, key_cache_size=1000):
+        self.name = name
+        self.E = EllipticCurve(GF(p), [a, b])
+        self.G = self.E(Gx, Gy)
+        self.n = Integer(n)
+        self.window = window
+        self.table = self.fixed_base_table(self.G, window)
+        self.key_window = key_window
+        self.key_cache_size = key_cache_size
+        self.key_tables = OrderedDict()  # (Qx, Qy) -> table, None until the key signs again
+
+    # table[i][j] = j * 2^(window*i) * P for every window position i and digit j
+    def fixed_base_table(self, P, window):
+        table = []
+        for i in range(ceil(self.n.nbits() / window)):
+            row = [self.E(0), P]
+            for j in range(2, 2^window):
+                row.append(row[-1] + P)
+            table.append(row)
+            P = row[-1] + P
+        return table
+
+    # k * P from a fixed-base table: one table addition per window of k, no doublings
+    def mul_fixed(self, table, window, k):
+        k = Integer(k) % self.n
+        mask = 2^window - 1
+        R = self.E(0)
+        i = 0
+        while k:
+            R += table[i][k & mask]
+            k >>= window
+            i += 1
+        return R
+
+    def mul_base(self, k):
+        return self.mul_fixed(self.table, self.window, k)
+
+    # u1*G + u2*Q with Shamir's trick: one shared doubling chain, adding G, Q or G+Q per bit
+    def shamir(self, u1, u2, Q):
+        u1, u2 = Integer(u1) % self.n, Integer(u2) % self.n
+        sums = [self.E(0), self.G, Q, self.G + Q]
+        R = self.E(0)
+        for i in range(max(u1.nbits(), u2.nbits()) - 1, -1, -1):
+            R += R
+            bits = 2 * ((u2 >> i) & 1) + ((u1 >> i) & 1)
+            if bits:
+                R += sums[bits]
+        return R
+
+    # The table for Q once it has signed before, otherwise None (and Q is remembered)
+    def key_table(self, Q):
+        key = (Q[0], Q[1])
+        if key not in self.key_tables:
+            self.key_tables[key] = None
+            if len(self.key_tables) > self.key_cache_size:
+                self.key_tables.popitem(last=False)
+            return None
+        self.key_tables.move_to_end(key)
+        if self.key_tables[key] is None:
+            self.key_tables[key] = self.fixed_base_table(Q, self.key_window)
+        return self.key_tables[key]
+
+    # u1*G + u2*Q, from both tables for repeat signers, else with Shamir's trick
+    def double_mul(self, u1, u2, Q):
+        table = self.key_table(Q)
+        if table is None:
+            return self.shamir(u1, u2, Q)
+        return self.mul_base(u1) + self.mul_fixed(table, self.key_window, u2)
+
+    def sign(self, e, d):
+        while True:
+            k = randint(1, self.n - 1)
+            r = Integer(self.mul_base(k)[0]) % self.n
+            if r == 0:
+                continue
+            s = inverse_mod(k, self.n) * (e + d * r) % self.n
+            if s != 0:
+                return r, s
+
+    def in_range(self, r, s, Q):
+        return 0 < r < self.n and 0 < s < self.n and not Q.is_zero()
+
+    # Verification with w = s^-1 mod n already computed
+    def check(self, e, r, w, Q):
+        X = self.double_mul(e * w % self.n, r * w % self.n, Q)
+        return not X.is_zero() and Integer(X[0]) % self.n == r
+
+    def verify(self, e, r, s, Q):
+        r, s = Integer(r), Integer(s)
+        return self.in_range(r, s, Q) and self.check(e, r, inverse_mod(s, self.n), Q)
+
+    # Verify a list of (e, r, s, Q): one inversion for all the s values, then one
+    # double-scalar multiplication per signature. An ECDSA signature only carries x(R),
+    # so the batch cannot be folded into a single random linear combination.
+    def verify_batch(self, signatures):
+        signatures = [(e, Integer(r), Integer(s), Q) for e, r, s, Q in signatures]
+        results = [self.in_range(r, s, Q) for e, r, s, Q in signatures]
+        candidates = [i for i, ok in enumerate(results) if ok]
+        inverses = batch_inverse([signatures[i][2] for i in candidates], self.n)
+        for i, w in zip(candidates, inverses):
+            e, r, s, Q = signatures[i]
+            results[i] = self.check(e, r, w, Q)
+        return results
+
 # 1. Global Domain Parameters (NIST P-256)
 p = 2^256 - 2^224 + 2^192 + 2^96 - 1  # Prime field
 a = -3
 b = 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b
-E = EllipticCurve(GF(p), [a,b])
-G = E(0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296, 
-      0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5)
-n = G.order()  # Order of G
+P256 = CurveContext("NIST P-256", p, a, b,
+                    0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+                    0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+                    0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551)
+E = P256.E
+G = P256.G
+n = P256.n  # Order of G (published constant)
 print("Base point G =", G)
 print("Order n =", hex(n), "\n")
 
 # 2. Key Generation
 d = randint(1, n-1)  # Private key
-Q = d * G  # Public key
+Q = P256.mul_base(d)  # Public key
 print("Private key (d) =", hex(d))
 print("Public key (Q = d*G) =", Q, "\n")
 
@@ -24,7 +155,7 @@ print("Message hash (e) =", hex(e))
 # Generate signature (r, s)
 while True:
     k = randint(1, n-1)
-    P = k * G
+    P = P256.mul_base(k)
     r = Integer(mod(P[0], n))  # Explicit conversion to Sage Integer
     if r == 0:
         continue
@@ -41,7 +172,7 @@ try:
     w = inverse_mod(s_int, n)
     u1 = mod(e * w, n)
     u2 = mod(r * w, n)
-    X = Integer(u1) * G + Integer(u2) * Q
+    X = P256.shamir(u1, u2, Q)  # u1*G + u2*Q in one pass
     v = mod(X[0], n)
     
     print("Verification:")
@@ -53,4 +184,11 @@ try:
     else:
         print("--> ERROR: Signature is invalid!")
 except Exception as ex:
-    print(f"Verification failed: {ex}")
\ No newline at end of file
+    print(f"Verification failed: {ex}")
+
+# 5. Batch Verification (repeat signer: Q gets its own table after its first signature)
+messages = [0x13 + i for i in range(20)]
+batch = [(m,) + P256.sign(m, d) + (Q,) for m in messages]
+batch.append((0x99,) + batch[0][1:])  # wrong message for a valid signature
+results = P256.verify_batch(batch)
+print("\nBatch verification:", sum(results), "of", len(results), "signatures valid")
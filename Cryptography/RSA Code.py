@@ -4,15 +4,16 @@ print("----RSA----\n")
 import hashlib
 
 # 1a. Generate 1024-bit primes p and q
+# proof=False: a BPSW probable-prime test instead of a primality proof, which dominated
+# key generation (no BPSW pseudoprime is known); random_prime already guarantees primality
+# to that level, so there is no separate is_prime() check
 min_bits = 1024
-p = random_prime(2^(min_bits + 1) - 1, lbound=2^min_bits)
-print("Is p prime?", p.is_prime())
+p = random_prime(2^(min_bits + 1) - 1, proof=False, lbound=2^min_bits)
 print("p =", p, "\n")
 
-q = random_prime(2^(min_bits + 1) - 1, lbound=2^min_bits)
-print("Is q prime?", q.is_prime())
+q = random_prime(2^(min_bits + 1) - 1, proof=False, lbound=2^min_bits)
 while p == q:  # Ensure p ≠ q
-    q = random_prime(2^(min_bits + 1) - 1, lbound=2^min_bits)
+    q = random_prime(2^(min_bits + 1) - 1, proof=False, lbound=2^min_bits)
 print("q =", q, "\n")
 
 # 1b. Compute n and φ(n)
@@ -32,6 +33,18 @@ else:
     d = inverse_mod(e, phi_n)
     print("Private key d =", d, "\n")
 
+# 1c'. CRT parameters: private-key operations on the half-size primes (about 4x faster)
+dP = d % (p - 1)
+dQ = d % (q - 1)
+qInv = inverse_mod(q, p)
+
+# m^d mod n from m^dP mod p and m^dQ mod q (Garner's recombination)
+def private_op(x):
+    m1 = power_mod(x, dP, p)
+    m2 = power_mod(x, dQ, q)
+    h = (qInv * (m1 - m2)) % p
+    return m2 + h * q
+
 # 1d. Generate random 256-bit AES key (m)
 k_aes = randint(0, 2^256 - 1)
 m = k_aes
@@ -43,7 +56,7 @@ ciphertext = power_mod(m, e, n)
 print("Ciphertext (c = m^e mod n) =", ciphertext, "\n")
 
 # Decrypt (verification)
-plaintext = power_mod(ciphertext, d, n)
+plaintext = private_op(ciphertext)
 print("--RSA Decryption--")
 print("Decrypted Plaintext =", plaintext, "\n")
 if plaintext == m:
@@ -60,5 +73,8 @@ print("f1 (as integer) =", f1, "\n")
 
 # 1g. Digital Signature: DS = f1^d mod n
 print("--Digital Signature--")
-DS = power_mod(f1, d, n)
+DS = private_op(f1)
+# Checked before it is printed: releasing a signature from a faulty CRT half would leak a factor of n
+if power_mod(DS, e, n) != f1:
+    raise ArithmeticError("RSA-CRT signature failed its consistency check")
 print("Digital Signature (DS = f1^d mod n) =", DS)
\ No newline at end of file
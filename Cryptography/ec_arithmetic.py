@@ -0,0 +1,367 @@
+# Elliptic curve arithmetic in plain Python for the a = -3 curves of the ECDSA scripts
+# (NIST P-256, ANSSI FRP256v1), for use where SageMath is not available.
+# Points are kept in Jacobian coordinates (X, Y, Z), standing for (X/Z^2, Y/Z^3), so
+# additions and doublings need no field inversion; results are converted back to affine
+# (x, y) once, or in batches with a single inversion. Affine infinity is None.
+import secrets
+import time
+from collections import OrderedDict
+
+INFINITY = (1, 1, 0)
+
+
+# Montgomery's trick: the inverses of all values mod m with a single modular inversion
+def batch_inverse(values, m):
+    if not values:
+        return []
+    prefix = []
+    acc = 1
+    for v in values:
+        acc = acc * v % m
+        prefix.append(acc)
+    inv = pow(acc, -1, m)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = inv * prefix[i-1] % m
+        inv = inv * values[i] % m
+    inverses[0] = inv
+    return inverses
+
+
+# Width-w non-adjacent form, least significant digit first: every non-zero digit is odd,
+# below 2^(w-1) in absolute value, and followed by at least w-1 zeros
+def wnaf(k, w):
+    digits = []
+    full, half = 1 << w, 1 << (w - 1)
+    while k:
+        if k & 1:
+            d = k & (full - 1)
+            if d >= half:
+                d -= full
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+# A short Weierstrass curve y^2 = x^3 - 3x + b over GF(p) with a base point G of prime
+# order n. The fixed-base table of G is built on first use.
+class Curve:
+    def __init__(self, name, p, b, gx, gy, n, window=8, key_window=4, key_cache_size=1000):
+        self.name = name
+        self.p = p
+        self.b = b
+        self.G = (gx, gy)
+        self.n = n
+        self.window = window
+        self.key_window = key_window
+        self.key_cache_size = key_cache_size
+        self.key_tables = OrderedDict()  # Q -> table, None until the key signs again
+        self._table = None
+
+    def is_on_curve(self, P):
+        if P is None:
+            return True
+        x, y = P
+        p = self.p
+        return 0 <= x < p and 0 <= y < p and (y * y - x * x * x + 3 * x - self.b) % p == 0
+
+    # dbl-2001-b: 3M + 5S, using a = -3 to get 3(X - Z^2)(X + Z^2) for the tangent slope
+    def double(self, P):
+        X1, Y1, Z1 = P
+        if not Z1 or not Y1:
+            return INFINITY
+        p = self.p
+        delta = Z1 * Z1 % p
+        gamma = Y1 * Y1 % p
+        beta = X1 * gamma % p
+        alpha = 3 * (X1 - delta) * (X1 + delta) % p
+        X3 = (alpha * alpha - 8 * beta) % p
+        Z3 = ((Y1 + Z1) ** 2 - gamma - delta) % p
+        Y3 = (alpha * (4 * beta - X3) - 8 * gamma * gamma) % p
+        return (X3, Y3, Z3)
+
+    # add-2007-bl: 11M + 5S
+    def add(self, P, Q):
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        if not Z1:
+            return Q
+        if not Z2:
+            return P
+        p = self.p
+        Z1Z1 = Z1 * Z1 % p
+        Z2Z2 = Z2 * Z2 % p
+        U1 = X1 * Z2Z2 % p
+        U2 = X2 * Z1Z1 % p
+        S1 = Y1 * Z2 * Z2Z2 % p
+        S2 = Y2 * Z1 * Z1Z1 % p
+        H = (U2 - U1) % p
+        r = 2 * (S2 - S1) % p
+        if not H:
+            return self.double(P) if not r else INFINITY
+        I = 4 * H * H % p
+        J = H * I % p
+        V = U1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * S1 * J) % p
+        Z3 = ((Z1 + Z2) ** 2 - Z1Z1 - Z2Z2) * H % p
+        return (X3, Y3, Z3)
+
+    # madd-2007-bl: P in Jacobian, Q affine (Z = 1), 7M + 4S
+    def add_affine(self, P, Q):
+        X1, Y1, Z1 = P
+        x2, y2 = Q
+        if not Z1:
+            return (x2, y2, 1)
+        p = self.p
+        Z1Z1 = Z1 * Z1 % p
+        U2 = x2 * Z1Z1 % p
+        S2 = y2 * Z1 * Z1Z1 % p
+        H = (U2 - X1) % p
+        r = 2 * (S2 - Y1) % p
+        if not H:
+            return self.double(P) if not r else INFINITY
+        HH = H * H % p
+        I = 4 * HH
+        J = H * I % p
+        V = X1 * I % p
+        X3 = (r * r - J - 2 * V) % p
+        Y3 = (r * (V - X3) - 2 * Y1 * J) % p
+        Z3 = ((Z1 + H) ** 2 - Z1Z1 - HH) % p
+        return (X3, Y3, Z3)
+
+    def to_affine(self, P):
+        X, Y, Z = P
+        if not Z:
+            return None
+        p = self.p
+        z = pow(Z, -1, p)
+        zz = z * z % p
+        return (X * zz % p, Y * zz * z % p)
+
+    # Many Jacobian points to affine with one field inversion
+    def batch_to_affine(self, points):
+        p = self.p
+        finite = [i for i, P in enumerate(points) if P[2]]
+        result = [None] * len(points)
+        for i, z in zip(finite, batch_inverse([points[i][2] for i in finite], p)):
+            X, Y, _ = points[i]
+            zz = z * z % p
+            result[i] = (X * zz % p, Y * zz * z % p)
+        return result
+
+    def negate(self, P):
+        return None if P is None else (P[0], -P[1] % self.p)
+
+    # table[i][j - 1] = j * 2^(window*i) * P (affine) for every window position i and digit j
+    def fixed_base_table(self, P, window):
+        points = []
+        base = (P[0], P[1], 1)
+        for i in range(-(-self.n.bit_length() // window)):
+            R = base
+            points.append(R)
+            for j in range(2, 1 << window):
+                R = self.add(R, base)
+                points.append(R)
+            base = self.add(R, base)
+        points = self.batch_to_affine(points)
+        row = (1 << window) - 1
+        return [points[i:i + row] for i in range(0, len(points), row)]
+
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = self.fixed_base_table(self.G, self.window)
+        return self._table
+
+    # k * P from a fixed-base table: one mixed addition per non-zero window, no doublings
+    def mul_fixed(self, table, window, k):
+        k %= self.n
+        mask = (1 << window) - 1
+        R = INFINITY
+        i = 0
+        while k:
+            digit = k & mask
+            if digit:
+                R = self.add_affine(R, table[i][digit - 1])
+            k >>= window
+            i += 1
+        return R
+
+    # k * G in Jacobian coordinates
+    def mul_base(self, k):
+        return self.mul_fixed(self.table, self.window, k)
+
+    # k * P for an arbitrary affine P with width-w NAF: about 256 doublings and 256/(w+1)
+    # mixed additions of precomputed odd multiples
+    def mul(self, k, P, w=5):
+        k %= self.n
+        if P is None or not k:
+            return INFINITY
+        odd = [(P[0], P[1], 1)]
+        twice = self.double(odd[0])
+        for i in range(1, 1 << (w - 2)):
+            odd.append(self.add(odd[-1], twice))
+        odd = self.batch_to_affine(odd)
+        negated = [self.negate(Q) for Q in odd]
+        R = INFINITY
+        for d in reversed(wnaf(k, w)):
+            R = self.double(R)
+            if d > 0:
+                R = self.add_affine(R, odd[d >> 1])
+            elif d < 0:
+                R = self.add_affine(R, negated[-d >> 1])
+        return R
+
+    # Montgomery ladder: the same add-and-double step for every bit of a fixed-length
+    # scalar (k + n or k + 2n, so the top bit is always set), with the operands picked by
+    # indexing rather than branching on the key. Python integers are not constant-time, so
+    # this removes the scalar-dependent operation sequence, not every timing difference.
+    def mul_ladder(self, k, P):
+        k %= self.n
+        if P is None or not k:
+            return INFINITY
+        bits = self.n.bit_length()
+        k += self.n
+        if k.bit_length() <= bits:
+            k += self.n
+        R = [(P[0], P[1], 1), self.double((P[0], P[1], 1))]
+        for i in range(bits - 1, -1, -1):
+            bit = (k >> i) & 1
+            R[1 - bit] = self.add(R[0], R[1])
+            R[bit] = self.double(R[bit])
+        return R[0]
+
+    # The table for Q once it has signed before, otherwise None (and Q is remembered)
+    def key_table(self, Q):
+        if Q not in self.key_tables:
+            self.key_tables[Q] = None
+            if len(self.key_tables) > self.key_cache_size:
+                self.key_tables.popitem(last=False)
+            return None
+        self.key_tables.move_to_end(Q)
+        if self.key_tables[Q] is None:
+            self.key_tables[Q] = self.fixed_base_table(Q, self.key_window)
+        return self.key_tables[Q]
+
+    # u1*G + u2*Q: u1*G from the base table, u2*Q from the key's table for repeat
+    # signers and with wNAF otherwise
+    def double_mul(self, u1, u2, Q):
+        table = self.key_table(Q)
+        if table is None:
+            R = self.mul(u2, Q)
+        else:
+            R = self.mul_fixed(table, self.key_window, u2)
+        return self.add(self.mul_base(u1), R)
+
+    def generate_key(self):
+        d = 1 + secrets.randbelow(self.n - 1)
+        return d, self.to_affine(self.mul_base(d))
+
+    # ECDSA signature (r, s) of the hash integer e; constant_time uses the ladder for k*G
+    def sign(self, e, d, constant_time=False):
+        n = self.n
+        while True:
+            k = 1 + secrets.randbelow(n - 1)
+            R = self.mul_ladder(k, self.G) if constant_time else self.mul_base(k)
+            r = self.to_affine(R)[0] % n
+            if not r:
+                continue
+            s = pow(k, -1, n) * (e + d * r) % n
+            if s:
+                return r, s
+
+    def in_range(self, r, s, Q):
+        return 0 < r < self.n and 0 < s < self.n and Q is not None and self.is_on_curve(Q)
+
+    # Verification with w = s^-1 mod n already computed. x(X) mod n == r is checked in
+    # Jacobian coordinates, as X == r * Z^2 (or (r + n) * Z^2 when r + n < p), so no
+    # field inversion is needed.
+    def check(self, e, r, w, Q):
+        n, p = self.n, self.p
+        X, _, Z = self.double_mul(e * w % n, r * w % n, Q)
+        if not Z:
+            return False
+        zz = Z * Z % p
+        return X == r * zz % p or (r + n < p and X == (r + n) * zz % p)
+
+    def verify(self, e, r, s, Q):
+        return self.in_range(r, s, Q) and self.check(e, r, pow(s, -1, self.n), Q)
+
+    # Verify a list of (e, r, s, Q) with one inversion for all the s values
+    def verify_batch(self, signatures):
+        results = [self.in_range(r, s, Q) for e, r, s, Q in signatures]
+        candidates = [i for i, ok in enumerate(results) if ok]
+        inverses = batch_inverse([signatures[i][2] for i in candidates], self.n)
+        for i, w in zip(candidates, inverses):
+            e, r, s, Q = signatures[i]
+            results[i] = self.check(e, r, w, Q)
+        return results
+
+
+P256 = Curve("NIST P-256",
+             2**256 - 2**224 + 2**192 + 2**96 - 1,
+             0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+             0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+             0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+             0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551)
+
+FRP256V1 = Curve("ANSSI FRP256v1",
+                 109454571331697278617670725030735128145969349647868738157201323556196022393859,
+                 107744541122042688792155207242782455150382764043089114141096634497567301547839,
+                 82638672503301278923015998535776227331280144783487139112686874194432446389503,
+                 43992510890276411535679659957604584722077886330284298232193264058442323471611,
+                 109454571331697278617670725030735128146004546811402412653072203207726079563233)
+
+
+def _time_per_call(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+# Timings of this module against Sage's generic scalar multiplication, when Sage is installed
+def benchmark(curve=P256, repeats=200):
+    d, Q = curve.generate_key()
+    e = secrets.randbits(256)
+    r, s = curve.sign(e, d)
+    curve.table  # build the base table outside the timings
+    scalars = [1 + secrets.randbelow(curve.n - 1) for _ in range(repeats)]
+    it = iter(scalars * 2)
+    print(f"---- {curve.name} ({repeats} operations each) ----")
+    print(f"k*G (fixed-base table):   {_time_per_call(lambda: curve.to_affine(curve.mul_base(next(it))), repeats) * 1e3:.3f} ms")
+    it = iter(scalars * 2)
+    print(f"k*Q (wNAF):               {_time_per_call(lambda: curve.to_affine(curve.mul(next(it), Q)), repeats) * 1e3:.3f} ms")
+    it = iter(scalars * 2)
+    print(f"k*Q (ladder):             {_time_per_call(lambda: curve.to_affine(curve.mul_ladder(next(it), Q)), repeats) * 1e3:.3f} ms")
+    print(f"sign:                     {_time_per_call(lambda: curve.sign(e, d), repeats) * 1e3:.3f} ms")
+
+    def verify_new_key():
+        curve.key_tables.clear()
+        return curve.verify(e, r, s, Q)
+
+    print(f"verify (new key):         {_time_per_call(verify_new_key, repeats) * 1e3:.3f} ms")
+    curve.verify(e, r, s, Q)  # the second signature from Q builds its table
+    print(f"verify (repeat signer):   {_time_per_call(lambda: curve.verify(e, r, s, Q), repeats) * 1e3:.3f} ms")
+    batch = [(e, r, s, Q)] * repeats
+    print(f"verify_batch, per sig:    {_time_per_call(lambda: curve.verify_batch(batch), 1) / repeats * 1e3:.3f} ms")
+    try:
+        from sage.all import EllipticCurve, GF
+    except ImportError:
+        print("SageMath is not installed; skipping the comparison with the Sage scripts")
+        return
+    E = EllipticCurve(GF(curve.p), [-3, curve.b])
+    G = E(*curve.G)
+    it = iter(scalars * 2)
+    print(f"k*G (Sage):               {_time_per_call(lambda: next(it) * G, repeats) * 1e3:.3f} ms")
+    it = iter(scalars * 2)
+    print(f"u1*G + u2*Q (Sage):       {_time_per_call(lambda: next(it) * G + next(it) * E(*Q), repeats // 2) * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    for curve in (P256, FRP256V1):
+        benchmark(curve)
@@ -0,0 +1,355 @@
+# RSA keys in plain Python: CRT private-key operations and fast prime generation.
+# Primes are found by sieving a window of odd candidates against a table of small primes,
+# then running Miller-Rabin only on the survivors; windows are searched in parallel
+# processes when more than one CPU is available.
+import os
+import math
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+SMALL_PRIME_LIMIT = 1 << 16
+# Odd candidates per sieve window; a 1024-bit prime is expected every ~355 odd numbers
+SIEVE_WINDOW = 1 << 12
+
+
+def small_primes(limit):
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit - 1) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+
+SMALL_PRIMES = small_primes(SMALL_PRIME_LIMIT)
+
+
+# Miller-Rabin rounds for an error probability below 2^-100 (FIPS 186-4, Table C.3)
+def miller_rabin_rounds(bits):
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return 40
+
+
+def is_probable_prime(m, rounds=None):
+    if m < 2:
+        return False
+    for p in SMALL_PRIMES[:64]:
+        if m % p == 0:
+            return m == p
+    if rounds is None:
+        rounds = miller_rabin_rounds(m.bit_length())
+    s = ((m - 1) & (1 - m)).bit_length() - 1
+    t = (m - 1) >> s
+    # Base 2 first: it rejects almost every composite that survived the sieve
+    bases = [2] + [2 + secrets.randbelow(m - 3) for _ in range(rounds - 1)]
+    for a in bases:
+        x = pow(a, t, m)
+        if x == 1 or x == m - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % m
+            if x == m - 1:
+                break
+        else:
+            return False
+    return True
+
+
+# Search one window of odd candidates above a random `bits`-bit start for a prime p with
+# gcd(p - 1, e) == 1. Candidates divisible by a small prime, or with p = 1 (mod e) for a
+# prime e, are struck out of a bytearray before any modular exponentiation.
+def search_window(bits, e=65537, window=SIEVE_WINDOW):
+    # Top two bits set so that the product of two such primes has exactly 2 * bits bits
+    start = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+    sieve = bytearray([1]) * window
+    for p in SMALL_PRIMES[1:]:
+        # start + 2j = 0 (mod p)  <=>  j = -start / 2 (mod p), and 1/2 = (p + 1) / 2
+        j = -(start % p) * ((p + 1) // 2) % p
+        sieve[j::p] = bytes(len(range(j, window, p)))
+    if e in SMALL_PRIMES or is_probable_prime(e):
+        j = (1 - start % e) * ((e + 1) // 2) % e
+        sieve[j::e] = bytes(len(range(j, window, e)))
+    rounds = miller_rabin_rounds(bits)
+    j = sieve.find(1)
+    while j >= 0:
+        candidate = start + 2 * j
+        if candidate.bit_length() == bits and math.gcd(candidate - 1, e) == 1 \
+                and is_probable_prime(candidate, rounds):
+            return candidate
+        j = sieve.find(1, j + 1)
+    return None
+
+
+# `count` distinct primes of `bits` bits, windows searched by `workers` processes
+def generate_primes(bits, count=2, e=65537, workers=None):
+    workers = workers or os.cpu_count()
+    primes = []
+    if workers == 1:
+        while len(primes) < count:
+            p = search_window(bits, e)
+            if p is not None and p not in primes:
+                primes.append(p)
+        return primes
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(search_window, bits, e) for _ in range(workers)}
+        while len(primes) < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                p = future.result()
+                if p is not None and p not in primes and len(primes) < count:
+                    primes.append(p)
+                if len(primes) < count:
+                    pending.add(executor.submit(search_window, bits, e))
+        for future in pending:
+            future.cancel()
+    return primes
+
+
+# An RSA key pair with the CRT parameters dP = d mod (p-1), dQ = d mod (q-1) and
+# qInv = q^-1 mod p, so private-key operations work on the two half-size primes
+class RSAKey:
+    def __init__(self, n, e, d, p, q):
+        self.n = n
+        self.e = e
+        self.d = d
+        self.p = p
+        self.q = q
+        self.dP = d % (p - 1)
+        self.dQ = d % (q - 1)
+        self.qInv = pow(q, -1, p)
+
+    @classmethod
+    def generate(cls, bits=2048, e=65537, workers=None):
+        p, q = generate_primes(bits // 2, 2, e, workers)
+        if p < q:
+            p, q = q, p
+        d = pow(e, -1, math.lcm(p - 1, q - 1))
+        return cls(p * q, e, d, p, q)
+
+    def encrypt(self, m):
+        return pow(m, self.e, self.n)
+
+    # m = c^d mod n via Garner's recombination of c^dP mod p and c^dQ mod q
+    def decrypt(self, c):
+        m1 = pow(c, self.dP, self.p)
+        m2 = pow(c, self.dQ, self.q)
+        h = self.qInv * (m1 - m2) % self.p
+        return m2 + h * self.q
+
+    # The signature is checked with the public exponent before it is released: a fault in
+    # one CRT half would otherwise leak a factor of n through gcd(s^e - f, n)
+    def sign(self, f):
+        s = self.decrypt(f)
+        if self.encrypt(s) != f % self.n:
+            raise ArithmeticError("RSA-CRT signature failed its consistency check")
+        return s
+
+    def verify(self, f, s):
+        return 0 <= s < self.n and self.encrypt(s) == f % self.n
+
+
+def _decrypt_chunk(params, ciphertexts):
+    key = RSAKey(*params)
+    return [key.decrypt(c) for c in ciphertexts]
+
+
+# Batch decryption under one key pair, for unwrapping many session keys at once: the CRT
+# parameters, split across worker processes for large batches. There is no batch
+# encryption: CPython's pow() already evaluates e = 65537 as 16 squarings and one multiply,
+# and Python-level Montgomery or addition-chain loops measured slower than it, so
+# RSAKey.encrypt is as fast as it gets here.
+# The process pool is started on the first large batch and reused by every later call;
+# close() (or leaving a `with RSABatch(...)` block) shuts it down. An executor passed in by
+# the caller is used as is and left running.
+class RSABatch:
+    def __init__(self, key, workers=None, chunk_size=256, executor=None):
+        self.key = key
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.owns_executor = executor is None
+
+    def decrypt(self, ciphertexts):
+        key = self.key
+        if (self.workers == 1 and self.owns_executor) or len(ciphertexts) <= self.chunk_size:
+            return [key.decrypt(c) for c in ciphertexts]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        params = (key.n, key.e, key.d, key.p, key.q)
+        chunks = [ciphertexts[i:i + self.chunk_size] for i in range(0, len(ciphertexts), self.chunk_size)]
+        return [m for chunk in self.executor.map(_decrypt_chunk, [params] * len(chunks), chunks) for m in chunk]
+
+    def close(self):
+        if self.owns_executor and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Fiat's batch RSA: one modulus with several small, pairwise coprime public exponents.
+# One ciphertext per exponent is decrypted with a single full-size CRT exponentiation
+# (to the inverse of the exponents' product) plus small ones, instead of one full
+# exponentiation each. Like the rest of this module this is raw RSA: messages must be
+# padded (e.g. OAEP) before encryption, all the more with exponents this small.
+class FiatBatchKey:
+    def __init__(self, key, exponents=(3, 5, 7, 11, 13, 17, 19, 23)):
+        self.key = key
+        self.exponents = tuple(exponents)
+        for i, e in enumerate(self.exponents):
+            if math.gcd(e, (key.p - 1) * (key.q - 1)) != 1:
+                raise ValueError("Exponent %d is not invertible for this key" % e)
+            if any(math.gcd(e, other) != 1 for other in self.exponents[:i]):
+                raise ValueError("Batch exponents must be pairwise coprime")
+        # One RSAKey per exponent, for the ciphertexts that cannot join the product tree
+        lam = math.lcm(key.p - 1, key.q - 1)
+        self.keys = [RSAKey(key.n, e, pow(e, -1, lam), key.p, key.q) for e in self.exponents]
+
+    # A key whose primes suit every batch exponent as well as the usual e
+    @classmethod
+    def generate(cls, bits=2048, exponents=(3, 5, 7, 11, 13, 17, 19, 23), e=65537, workers=None):
+        p, q = generate_primes(bits // 2, 2, e * math.prod(exponents), workers)
+        if p < q:
+            p, q = q, p
+        d = pow(e, -1, math.lcm(p - 1, q - 1))
+        return cls(RSAKey(p * q, e, d, p, q), exponents)
+
+    # Raw RSA under the index-th exponent. m must already be padded to the full width of n:
+    # with e = 3, 5, 7, ... an unpadded short m has m^e < n, and anyone recovers it with
+    # an integer e-th root.
+    def encrypt(self, m, index):
+        return pow(m, self.exponents[index], self.key.n)
+
+    # The i-th ciphertext must be encrypted under the i-th exponent (fewer than all the
+    # exponents may be given). Splitting the tree divides by the ciphertexts, so those that
+    # are not units mod n (0, or sharing a factor with n) are decrypted on their own.
+    def decrypt_batch(self, ciphertexts):
+        if len(ciphertexts) > len(self.exponents):
+            raise ValueError("At most %d ciphertexts per batch" % len(self.exponents))
+        key = self.key
+        messages = [None] * len(ciphertexts)
+        units = []
+        for i, c in enumerate(ciphertexts):
+            if math.gcd(c, key.n) == 1:
+                units.append(i)
+            else:
+                messages[i] = self.keys[i].decrypt(c % key.n)
+        if not units:
+            return messages
+        tree = self._combine([(ciphertexts[i], self.exponents[i]) for i in units])
+        # The one full-size exponentiation: prod(c_i^(1/e_i)) = M^(1/E) for E = prod(e_i)
+        M, E, _ = tree
+        m1 = pow(M, pow(E, -1, key.p - 1), key.p)
+        m2 = pow(M, pow(E, -1, key.q - 1), key.q)
+        root = m2 + key.qInv * (m1 - m2) % key.p * key.q
+        for i, m in zip(units, self._split(tree, root)):
+            messages[i] = m
+        return messages
+
+    # Product tree: each node is (M, E, children) with M = prod(c_i^(E/e_i)) over its leaves
+    def _combine(self, leaves):
+        n = self.key.n
+        if len(leaves) == 1:
+            c, e = leaves[0]
+            return (c % n, e, None)
+        middle = len(leaves) // 2
+        left, right = self._combine(leaves[:middle]), self._combine(leaves[middle:])
+        M = pow(left[0], right[1], n) * pow(right[0], left[1], n) % n
+        return (M, left[1] * right[1], (left, right))
+
+    # Split a node's root prod(c_i^(1/e_i)) into its children's: with X = 1 (mod E_L) and
+    # X = 0 (mod E_R), root^X = A * M_L^((X-1)/E_L) * M_R^(X/E_R) where A is the left root
+    def _split(self, node, root):
+        n = self.key.n
+        if node[2] is None:
+            return [root]
+        left, right = node[2]
+        X = right[1] * pow(right[1], -1, left[1])
+        denominator = pow(left[0], (X - 1) // left[1], n) * pow(right[0], X // right[1], n) % n
+        A = pow(root, X, n) * pow(denominator, -1, n) % n
+        B = root * pow(A, -1, n) % n
+        return self._split(left, A) + self._split(right, B)
+
+
+def _time_per_call(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark(bits=2048, repeats=50):
+    keygen = _time_per_call(lambda: RSAKey.generate(bits), 5)
+    key = RSAKey.generate(bits)
+    c = key.encrypt(secrets.randbits(256))
+    full = _time_per_call(lambda: pow(c, key.d, key.n), repeats)
+    crt = _time_per_call(lambda: key.decrypt(c), repeats)
+    print(f"---- RSA-{bits} ----")
+    print(f"key generation:           {keygen * 1e3:.1f} ms ({os.cpu_count()} worker(s))")
+    print(f"decrypt, c^d mod n:       {full * 1e3:.3f} ms")
+    print(f"decrypt, CRT:             {crt * 1e3:.3f} ms ({full / crt:.1f}x)")
+
+
+# Unwrapping session keys: per-call pow against the batch decryption APIs, in
+# operations/second (encryption has no batch path and is the per-call baseline only).
+# The messages are random values below n, standing in for OAEP-padded session keys; a raw
+# 256-bit key under e = 3 would be recoverable with a cube root.
+# The pooled row uses at least two workers and a batch of two chunks per worker, so that the
+# process pool runs even on one CPU; the pool is started before the timed call.
+def benchmark_batch(bits=2048, count=2000, workers=None, chunk_size=64):
+    fiat = FiatBatchKey.generate(bits)
+    key = fiat.key
+    workers = max(2, workers or os.cpu_count())
+    messages = [secrets.randbelow(key.n) for _ in range(count)]
+
+    start = time.perf_counter()
+    ciphertexts = [key.encrypt(m) for m in messages]
+    per_call_encrypt = count / (time.perf_counter() - start)
+
+    sample = ciphertexts[:count // 10]
+    start = time.perf_counter()
+    assert [pow(c, key.d, key.n) for c in sample] == messages[:len(sample)]
+    per_call_decrypt = len(sample) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    assert [key.decrypt(c) for c in sample] == messages[:len(sample)]
+    serial_decrypt = len(sample) / (time.perf_counter() - start)
+
+    pooled = ciphertexts[:2 * chunk_size * workers]
+    with RSABatch(key, workers, chunk_size) as batch:
+        batch.decrypt(pooled[:chunk_size + 1])
+        start = time.perf_counter()
+        assert batch.decrypt(pooled) == messages[:len(pooled)]
+        pooled_decrypt = len(pooled) / (time.perf_counter() - start)
+
+    width = len(fiat.exponents)
+    fiat_ciphertexts = [fiat.encrypt(m, i % width) for i, m in enumerate(messages[:len(sample)])]
+    start = time.perf_counter()
+    decrypted = []
+    for i in range(0, len(fiat_ciphertexts), width):
+        decrypted += fiat.decrypt_batch(fiat_ciphertexts[i:i + width])
+    fiat_decrypt = len(sample) / (time.perf_counter() - start)
+    assert decrypted == messages[:len(sample)]
+
+    print(f"---- RSA-{bits} batch throughput ----")
+    print(f"encrypt, per-call pow:    {per_call_encrypt:9.0f} /s (baseline, no batch path)")
+    print(f"decrypt, per-call pow:    {per_call_decrypt:9.0f} /s")
+    print(f"decrypt, CRT (serial):    {serial_decrypt:9.0f} /s")
+    print(f"decrypt, RSABatch pool:   {pooled_decrypt:9.0f} /s ({workers} workers, chunks of {chunk_size}, "
+          f"{os.cpu_count()} CPU(s))")
+    print(f"decrypt, Fiat batch of {width}: {fiat_decrypt:9.0f} /s")
+
+
+if __name__ == "__main__":
+    benchmark(2048)
+    benchmark(3072, repeats=20)
+    benchmark_batch(2048)
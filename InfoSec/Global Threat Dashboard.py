@@ -1,79 +1,554 @@
+import os
+import re
+import sys
+import argparse
+import math
+import json
+import shutil
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.figure import Figure
 
 # Load and clean data
-csv_path =   # Change this to your actual CSV path
-df = pd.read_csv(csv_path)
-df.columns = df.columns.str.strip()
-
-# Strip leading/trailing whitespace in string columns
-for col in df.select_dtypes(include='object'):
-    df[col] = df[col].str.strip()
-
-# Convert numerical columns
-df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
-df['Financial Loss (in Million $)'] = pd.to_numeric(df['Financial Loss (in Million $)'], errors='coerce')
-df['Incident Resolution Time (in Hours)'] = pd.to_numeric(df['Incident Resolution Time (in Hours)'], errors='coerce')
-df['Number of Affected Users'] = pd.to_numeric(df['Number of Affected Users'], errors='coerce')
-
-# Drop rows with critical missing data
-df.dropna(subset=['Year', 'Financial Loss (in Million $)',
-                  'Incident Resolution Time (in Hours)',
-                  'Number of Affected Users'], inplace=True)
-
-# Remove negative or invalid entries
-df = df[df['Financial Loss (in Million $)'] >= 0]
-df = df[df['Incident Resolution Time (in Hours)'] >= 0]
-df = df[df['Number of Affected Users'] >= 0]
-
-# Cap outliers (99th percentile)
-df['Financial Loss (in Million $)'] = df['Financial Loss (in Million $)'].clip(upper=df['Financial Loss (in Million $)'].quantile(0.99))
-df['Incident Resolution Time (in Hours)'] = df['Incident Resolution Time (in Hours)'].clip(upper=df['Incident Resolution Time (in Hours)'].quantile(0.99))
-df['Number of Affected Users'] = df['Number of Affected Users'].clip(upper=df['Number of Affected Users'].quantile(0.99))
-
-# === 1. Financial Loss Over Time ===
-plt.figure(figsize=(12,6))
-sns.lineplot(data=df.groupby('Year')['Financial Loss (in Million $)'].sum().reset_index(),
-             x='Year', y='Financial Loss (in Million $)', marker='o')
-plt.title('Total Financial Loss Over Time')
-plt.ylabel('Financial Loss (Million $)')
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# === 2. Incidents by Country ===
-plt.figure(figsize=(14,6))
-top_countries = df['Country'].value_counts().head(10).index
-tmp = df[df['Country'].isin(top_countries)]
-sns.countplot(data=tmp, y='Country', order=top_countries)
-plt.title('Top 10 Countries by Number of Cyber Incidents')
-plt.xlabel('Incident Count')
-plt.tight_layout()
-plt.show()
-
-# === 3. Financial Loss by Industry ===
-plt.figure(figsize=(12,6))
-industry_agg = df.groupby('Target Industry')['Financial Loss (in Million $)'].sum().sort_values(ascending=False).head(10)
-sns.barplot(x=industry_agg.values, y=industry_agg.index)
-plt.title('Top 10 Industries by Financial Loss')
-plt.xlabel('Total Financial Loss (Million $)')
-plt.tight_layout()
-plt.show()
-
-# === 4. Boxplot: Resolution Time by Defense Mechanism ===
-plt.figure(figsize=(14,6))
-top_mechanisms = df['Defense Mechanism Used'].value_counts().head(10).index
-tmp = df[df['Defense Mechanism Used'].isin(top_mechanisms)]
-sns.boxplot(data=tmp, x='Defense Mechanism Used', y='Incident Resolution Time (in Hours)')
-plt.xticks(rotation=45)
-plt.title('Resolution Time by Defense Mechanism')
-plt.tight_layout()
-plt.show()
-
-# === 5. Attack Types Distribution ===
-plt.figure(figsize=(12,6))
-sns.countplot(data=df, y='Attack Type', order=df['Attack Type'].value_counts().index[:10])
-plt.title('Top 10 Most Common Attack Types')
-plt.tight_layout()
-plt.show()
+csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dataset',
+                        '[Infosec_Kaggle] Global_Cybersecurity_Threats_2015-2024.csv')  # Change this to your actual CSV path
+cache_root = os.path.join(os.path.dirname(csv_path), '.dashboard_cache')
+
+# Bump when the cleaning below changes so stale caches are not reused
+CACHE_VERSION = 2
+
+NUMERIC_COLUMNS = ['Year', 'Financial Loss (in Million $)',
+                   'Incident Resolution Time (in Hours)',
+                   'Number of Affected Users']
+CAPPED_COLUMNS = NUMERIC_COLUMNS[1:]
+
+
+# Hash the source file in blocks so the cache key follows its contents, not its mtime
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.blake2b(str(CACHE_VERSION).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Strip whitespace on the categories rather than on every row, merging ones that collide
+def strip_categories(column):
+    stripped = column.cat.categories.str.strip()
+    categories, inverse = np.unique(np.asarray(stripped, dtype=str), return_inverse=True)
+    codes = column.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=column.index, name=column.name)
+
+
+# Parse the CSV with text columns as categoricals and apply the cleaning in one pass.
+# Outliers are left in place: their caps depend on the whole history (see ThreatCube.caps).
+def load_csv(path):
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {name: 'category' for name in header if name.strip() not in NUMERIC_COLUMNS}
+    df = pd.read_csv(path, dtype=dtypes)
+    df.columns = df.columns.str.strip()
+
+    for col in df.columns:
+        if col in NUMERIC_COLUMNS:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            df[col] = strip_categories(df[col])
+
+    # Drop rows with critical missing data, then negative or invalid entries
+    valid = df[NUMERIC_COLUMNS].notna().all(axis=1) & (df[CAPPED_COLUMNS] >= 0).all(axis=1)
+    df = df[valid].reset_index(drop=True)
+    df['Year'] = df['Year'].astype('int16')
+    for col in CAPPED_COLUMNS:
+        df[col] = df[col].astype('float64')
+    return df
+
+
+# Persist a cleaned frame as one .npy per column (codes + categories for categoricals)
+def save_columns(df, columns_dir):
+    tmp_dir = columns_dir + '.tmp%d' % os.getpid()
+    os.makedirs(tmp_dir, exist_ok=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp_dir, '%d.npy' % i), df[col].cat.codes.to_numpy())
+            np.save(os.path.join(tmp_dir, '%d.categories.npy' % i),
+                    np.asarray(df[col].cat.categories, dtype=str))
+            columns.append([col, 'category'])
+        else:
+            np.save(os.path.join(tmp_dir, '%d.npy' % i), df[col].to_numpy())
+            columns.append([col, 'numeric'])
+    with open(os.path.join(tmp_dir, 'columns.json'), 'w') as f:
+        json.dump(columns, f)
+    try:
+        os.rename(tmp_dir, columns_dir)
+    except OSError:
+        # Another run already published the same batch
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+# Rebuild a cleaned frame from memory-mapped column files
+def load_columns(columns_dir):
+    with open(os.path.join(columns_dir, 'columns.json')) as f:
+        columns = json.load(f)
+    data = {}
+    for i, (col, kind) in enumerate(columns):
+        values = np.load(os.path.join(columns_dir, '%d.npy' % i), mmap_mode='r')
+        if kind == 'category':
+            categories = np.load(os.path.join(columns_dir, '%d.categories.npy' % i))
+            data[col] = pd.Categorical.from_codes(values, categories)
+        else:
+            data[col] = values
+    return pd.DataFrame(data)
+
+
+# Dimensions and measures of the pre-aggregated cube the charts read from
+DIMENSIONS = ['Year', 'Country', 'Attack Type', 'Target Industry', 'Attack Source',
+              'Security Vulnerability Type', 'Defense Mechanism Used']
+MEASURES = CAPPED_COLUMNS
+# Outliers are capped at this quantile of the whole history (99th percentile)
+CAP_QUANTILE = 0.99
+# Relative accuracy of the log-bucket quantile sketches
+SKETCH_ACCURACY = 0.01
+# Values at or below this fall in the sketches' zero bucket
+MIN_SKETCH_VALUE = 1e-6
+# Key spaces up to this size are counted with a dense bincount instead of a sort
+DENSE_KEY_LIMIT = 1 << 24
+
+# Long table of (cell, log bucket) entries with their row counts and exact value sums
+Sketch = namedtuple('Sketch', ['cells', 'buckets', 'counts', 'sums'])
+
+
+# Group equal integer keys; unique keys come back sorted, with counts and each key's group
+def count_keys(keys, size):
+    if size <= DENSE_KEY_LIMIT:
+        counts = np.bincount(keys, minlength=size)
+        unique = np.flatnonzero(counts)
+        lookup = np.zeros(size, dtype=np.int64)
+        lookup[unique] = np.arange(len(unique))
+        return unique, counts[unique], lookup[keys]
+    unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    return unique, counts, inverse
+
+
+# Sum each weight array over equal integer keys (None counts the keys); unique keys come back sorted
+def sum_by_key(keys, size, *weights):
+    if size <= DENSE_KEY_LIMIT:
+        occupied = np.bincount(keys, minlength=size)
+        unique = np.flatnonzero(occupied)
+        return unique, [(occupied if w is None else np.bincount(keys, weights=w, minlength=size))[unique]
+                        for w in weights]
+    if not len(keys):
+        return keys, [np.zeros(0) for w in weights]
+    order = np.argsort(keys)
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], [np.add.reduceat(np.ones(len(keys), dtype=np.int64) if w is None else w[order], starts)
+                          for w in weights]
+
+
+# Counts and mergeable quantile sketches per non-empty combination of the dimensions,
+# built in one pass over the rows. Every chart is a roll-up of these cells, and cubes
+# built from separate batches merge into the cube of their union.
+class ThreatCube:
+    def __init__(self, df, dimensions=DIMENSIONS, measures=MEASURES, accuracy=SKETCH_ACCURACY):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.accuracy = accuracy
+        self.batches = []
+        self.levels = []
+        codes = []
+        for dim in self.dimensions:
+            column = df[dim]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                dim_codes, levels = column.cat.codes.to_numpy(), column.cat.categories
+            else:
+                dim_codes, levels = pd.factorize(column, sort=True)
+            # Missing values get their own trailing level, which roll-ups skip
+            codes.append(np.where(dim_codes < 0, len(levels), dim_codes))
+            self.levels.append(pd.Index(np.asarray(levels), name=dim))
+        cells, self.counts, cell_of_row = count_keys(np.ravel_multi_index(codes, self.shape),
+                                                     math.prod(self.shape))
+        del codes
+        self.cell_codes = np.stack(np.unravel_index(cells, self.shape), axis=1)
+        self.sketches = {}
+        for measure in self.measures:
+            self.sketches[measure] = self._sketch(cell_of_row, df[measure].to_numpy(dtype=np.float64))
+        self._caps = None
+        self._cell_sums = {}
+
+    @property
+    def shape(self):
+        return tuple(len(levels) + 1 for levels in self.levels)
+
+    @property
+    def gamma(self):
+        return (1 + self.accuracy) / (1 - self.accuracy)
+
+    @property
+    def zero_bucket(self):
+        return int(np.ceil(np.log(MIN_SKETCH_VALUE) / np.log(self.gamma)))
+
+    # Log-spaced buckets: a bucket i value lies in (gamma^(i-1), gamma^i]
+    def _sketch(self, cell_of_row, values):
+        buckets = np.full(len(values), self.zero_bucket, dtype=np.int64)
+        positive = values > MIN_SKETCH_VALUE
+        buckets[positive] = np.maximum(np.ceil(np.log(values[positive]) / np.log(self.gamma)), self.zero_bucket + 1)
+        return self._merge_entries(cell_of_row, buckets, None, values, len(self.counts))
+
+    # Combine sketch entries that share a cell (or group) and bucket
+    @staticmethod
+    def _merge_entries(cells, buckets, counts, sums, n_cells):
+        low = int(buckets.min()) if len(buckets) else 0
+        width = int(buckets.max()) - low + 1 if len(buckets) else 1
+        weights = (counts,) if sums is None else (counts, sums)
+        keys, totals = sum_by_key(cells.astype(np.int64) * width + (buckets - low), n_cells * width, *weights)
+        counts, sums = totals[0], (totals[1] if sums is not None else None)
+        # Narrow index dtypes keep the stored sketches small
+        cell_dtype = np.int32 if n_cells < 2 ** 31 else np.int64
+        return Sketch((keys // width).astype(cell_dtype), (keys % width + low).astype(np.int16),
+                      counts.astype(np.int64), sums)
+
+    def bucket_values(self, buckets, cap=None):
+        values = 2 * self.gamma ** buckets.astype(np.float64) / (self.gamma + 1)
+        values = np.where(buckets == self.zero_bucket, 0.0, values)
+        return values if cap is None else np.minimum(values, cap)
+
+    # Fold another cube (e.g. one built from a new batch) into this one
+    def merge(self, other):
+        if (other.dimensions, other.measures, other.accuracy) != (self.dimensions, self.measures, self.accuracy):
+            raise ValueError("Cannot merge cubes with different dimensions, measures or accuracy")
+        levels = [mine.union(theirs) for mine, theirs in zip(self.levels, other.levels)]
+        shape = tuple(len(dim_levels) + 1 for dim_levels in levels)
+
+        def cell_keys(cube):
+            codes = []
+            for pos, (old, new) in enumerate(zip(cube.levels, levels)):
+                lookup = np.append(new.get_indexer(old), len(new))
+                codes.append(lookup[cube.cell_codes[:, pos]])
+            return np.ravel_multi_index(codes, shape)
+
+        mine, theirs = cell_keys(self), cell_keys(other)
+        cells, (counts,) = sum_by_key(np.concatenate([mine, theirs]), math.prod(shape),
+                                      np.concatenate([self.counts, other.counts]))
+        mine, theirs = np.searchsorted(cells, mine), np.searchsorted(cells, theirs)
+        for measure in self.measures:
+            a, b = self.sketches[measure], other.sketches[measure]
+            self.sketches[measure] = self._merge_entries(
+                np.concatenate([mine[a.cells], theirs[b.cells]]), np.concatenate([a.buckets, b.buckets]),
+                np.concatenate([a.counts, b.counts]), np.concatenate([a.sums, b.sums]), len(cells))
+        self.levels = levels
+        self.counts = counts.astype(np.int64)
+        self.cell_codes = np.stack(np.unravel_index(cells, shape), axis=1)
+        self.batches = self.batches + other.batches
+        self._caps = None
+        self._cell_sums = {}
+
+    def save(self, path):
+        meta = {'dimensions': self.dimensions, 'measures': self.measures, 'accuracy': self.accuracy,
+                'batches': self.batches, 'levels': [levels.tolist() for levels in self.levels],
+                'caps': {measure: float(cap) for measure, cap in self.caps().items()}}
+        arrays = {'cell_codes': self.cell_codes, 'counts': self.counts}
+        for i, measure in enumerate(self.measures):
+            for field, values in self.sketches[measure]._asdict().items():
+                arrays['%s_%d' % (field, i)] = values
+        tmp_path = path + '.tmp%d' % os.getpid()
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        cube = cls.__new__(cls)
+        with np.load(path) as arrays:
+            meta = json.loads(str(arrays['meta']))
+            cube.dimensions = meta['dimensions']
+            cube.measures = meta['measures']
+            cube.accuracy = meta['accuracy']
+            cube.batches = meta['batches']
+            cube.levels = [pd.Index(levels, name=dim) for dim, levels in zip(cube.dimensions, meta['levels'])]
+            cube.cell_codes = arrays['cell_codes']
+            cube.counts = arrays['counts']
+            cube.sketches = {measure: Sketch(*(arrays['%s_%d' % (field, i)] for field in Sketch._fields))
+                             for i, measure in enumerate(cube.measures)}
+        cube._caps = meta['caps']
+        cube._cell_sums = {}
+        return cube
+
+    # Outlier caps per measure from the merged sketches, recomputed after every merge
+    def caps(self):
+        if self._caps is None:
+            everything = np.zeros(len(self.counts), dtype=np.int64)
+            self._caps = {measure: self._quantiles(self._group_buckets(everything, measure), 1, [CAP_QUANTILE])[0, 0]
+                          for measure in self.measures}
+        return self._caps
+
+    # Measure sums per cell, clipped at the caps: exact below the cap's bucket and within
+    # the sketch accuracy inside it
+    def cell_sums(self, clip=True):
+        if clip not in self._cell_sums:
+            caps = self.caps() if clip else {}
+            sums = {}
+            for measure in self.measures:
+                sketch = self.sketches[measure]
+                weights = np.minimum(sketch.sums, sketch.counts * caps[measure]) if measure in caps else sketch.sums
+                sums[measure] = np.bincount(sketch.cells, weights=weights, minlength=len(self.counts))
+            self._cell_sums[clip] = sums
+        return self._cell_sums[clip]
+
+    # Map every cell to its group over `dims` (-1 when filtered out or missing)
+    def _groups(self, dims, filters=None):
+        positions = [self.dimensions.index(dim) for dim in dims]
+        keep = np.ones(len(self.counts), dtype=bool)
+        for pos in positions:
+            keep &= self.cell_codes[:, pos] < len(self.levels[pos])
+        for dim, values in (filters or {}).items():
+            pos = self.dimensions.index(dim)
+            keep &= np.isin(self.cell_codes[:, pos], self.levels[pos].get_indexer(values))
+        shape = [len(self.levels[pos]) for pos in positions]
+        keys = np.zeros(int(keep.sum()), dtype=np.int64)
+        for pos, size in zip(positions, shape):
+            keys = keys * size + self.cell_codes[keep, pos]
+        groups, _, group_of_kept = count_keys(keys, math.prod(shape))
+        group_of_cell = np.full(len(self.counts), -1, dtype=np.int64)
+        group_of_cell[keep] = group_of_kept
+        if not positions:
+            return group_of_cell, pd.Index(['All'])
+        codes = np.unravel_index(groups, shape)
+        if len(positions) == 1:
+            return group_of_cell, self.levels[positions[0]][codes[0]]
+        return group_of_cell, pd.MultiIndex.from_arrays(
+            [self.levels[pos][code] for pos, code in zip(positions, codes)])
+
+    # Incident count and measure sums per group, with values above the caps clipped
+    def aggregate(self, dims, filters=None, clip=True):
+        group_of_cell, index = self._groups(dims, filters)
+        kept = group_of_cell >= 0
+        data = {'count': np.bincount(group_of_cell[kept], weights=self.counts[kept], minlength=len(index)).astype(np.int64)}
+        for measure, sums in self.cell_sums(clip).items():
+            data[measure] = np.bincount(group_of_cell[kept], weights=sums[kept], minlength=len(index))
+        return pd.DataFrame(data, index=index)
+
+    # Sketch entries merged per group (without their sums), sorted by group then bucket
+    def _group_buckets(self, group_of_cell, measure):
+        sketch = self.sketches[measure]
+        groups = group_of_cell[sketch.cells]
+        kept = groups >= 0
+        return self._merge_entries(groups[kept], sketch.buckets[kept], sketch.counts[kept],
+                                   None, int(group_of_cell.max()) + 1)
+
+    # Lower-rank quantiles of each group from its merged buckets
+    def _quantiles(self, entries, n_groups, qs, cap=None):
+        cumulative = np.cumsum(entries.counts)
+        totals = np.bincount(entries.cells, weights=entries.counts, minlength=n_groups)
+        before = np.cumsum(totals) - totals
+        result = np.empty((n_groups, len(qs)))
+        for j, q in enumerate(qs):
+            ranks = before + np.floor(q * (totals - 1))
+            result[:, j] = self.bucket_values(entries.buckets[np.searchsorted(cumulative, ranks, side='right')], cap)
+        return result
+
+    def quantiles(self, dims, measure, qs, filters=None, clip=True):
+        group_of_cell, index = self._groups(dims, filters)
+        cap = self.caps()[measure] if clip else None
+        values = self._quantiles(self._group_buckets(group_of_cell, measure), len(index), qs, cap)
+        return pd.DataFrame(values, index=index, columns=list(qs))
+
+    # Box statistics per label for Axes.bxp, with 1.5 IQR whiskers taken from the sketch
+    def boxplot_stats(self, dim, measure, labels, filters=None, clip=True):
+        group_of_cell, index = self._groups([dim], filters)
+        cap = self.caps()[measure] if clip else None
+        entries = self._group_buckets(group_of_cell, measure)
+        quartiles = self._quantiles(entries, len(index), [0.25, 0.5, 0.75], cap)
+        stats = []
+        for label in labels:
+            g = index.get_loc(label)
+            lo, hi = np.searchsorted(entries.cells, [g, g + 1])
+            values = self.bucket_values(entries.buckets[lo:hi], cap)
+            q1, median, q3 = quartiles[g]
+            reach = 1.5 * (q3 - q1)
+            inside = (values >= q1 - reach) & (values <= q3 + reach)
+            stats.append({'label': label, 'q1': q1, 'med': median, 'q3': q3,
+                          'whislo': values[inside].min(), 'whishi': values[inside].max(),
+                          'fliers': values[~inside]})
+        return stats
+
+
+# The store under cache_root keeps the cleaned, unclipped rows of every ingested batch
+# (batches/<digest>) and the merged cube, whose metadata lists the batches it contains.
+CUBE_FILE = 'cube-v%d.npz' % CACHE_VERSION
+
+
+def load_cube(store=cache_root):
+    path = os.path.join(store, CUBE_FILE)
+    return ThreatCube.load(path) if os.path.isfile(path) else None
+
+
+# Ingest a CSV batch: clean it, keep its rows and fold its cube into the stored one.
+# The cost follows the batch size and the number of cube cells, not the history.
+def append_batch(path, store=cache_root):
+    digest = file_digest(path)
+    cube = load_cube(store)
+    if cube is not None and digest in cube.batches:
+        return cube
+    batch = load_csv(path)
+    os.makedirs(os.path.join(store, 'batches'), exist_ok=True)
+    save_columns(batch, os.path.join(store, 'batches', digest))
+    batch_cube = ThreatCube(batch)
+    batch_cube.batches = [digest]
+    if cube is None:
+        cube = batch_cube
+    else:
+        cube.merge(batch_cube)
+    cube.save(os.path.join(store, CUBE_FILE))
+    return cube
+
+
+# Materialize the cleaned rows of every ingested batch, capped like the charts
+def load_threats(store=cache_root, clip=True):
+    cube = load_cube(store)
+    frames = [load_columns(os.path.join(store, 'batches', digest)) for digest in cube.batches]
+    df = pd.DataFrame({col: pd.api.types.union_categoricals([frame[col] for frame in frames])
+                       if isinstance(frames[0][col].dtype, pd.CategoricalDtype)
+                       else np.concatenate([frame[col].to_numpy() for frame in frames])
+                       for col in frames[0].columns})
+    if clip:
+        for col, cap in cube.caps().items():
+            df[col] = df[col].clip(upper=cap)
+    return df
+
+
+LOSS = 'Financial Loss (in Million $)'
+RESOLUTION_TIME = 'Incident Resolution Time (in Hours)'
+
+# A chart is drawn from already aggregated data, so it pickles cheaply to a worker.
+# `dimension` is the one it breaks down, which per-value report packs leave out.
+Chart = namedtuple('Chart', ['name', 'dimension', 'figsize', 'draw', 'args'])
+
+
+def draw_line(ax, series, title, ylabel):
+    ax.plot(series.index, series.values, marker='o')
+    ax.set_title(title)
+    ax.set_xlabel(series.index.name)
+    ax.set_ylabel(ylabel)
+    ax.grid(True)
+
+
+# Horizontal bars, largest first from the top
+def draw_bars(ax, series, title, xlabel):
+    ax.barh(series.index.astype(str), series.values, color=plt.get_cmap('tab10').colors[:len(series)])
+    ax.invert_yaxis()
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(series.index.name)
+
+
+def draw_box(ax, stats, title, xlabel, ylabel):
+    if stats:
+        ax.bxp(stats)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+
+# The dashboard's five charts, optionally restricted by cube filters
+def chart_specs(cube, filters=None):
+    # === 1. Financial Loss Over Time ===
+    yearly_loss = cube.aggregate(['Year'], filters)[LOSS]
+    # === 2. Incidents by Country ===
+    top_countries = cube.aggregate(['Country'], filters)['count'].sort_values(ascending=False).head(10)
+    # === 3. Financial Loss by Industry ===
+    industry_agg = cube.aggregate(['Target Industry'], filters)[LOSS].sort_values(ascending=False).head(10)
+    # === 4. Boxplot: Resolution Time by Defense Mechanism ===
+    mechanism_counts = cube.aggregate(['Defense Mechanism Used'], filters)['count']
+    top_mechanisms = mechanism_counts.sort_values(ascending=False).head(10).index
+    mechanism_stats = cube.boxplot_stats('Defense Mechanism Used', RESOLUTION_TIME, top_mechanisms, filters)
+    # === 5. Attack Types Distribution ===
+    attack_counts = cube.aggregate(['Attack Type'], filters)['count'].sort_values(ascending=False).head(10)
+    return [
+        Chart('financial_loss_over_time', 'Year', (12, 6), draw_line,
+              (yearly_loss, 'Total Financial Loss Over Time', 'Financial Loss (Million $)')),
+        Chart('incidents_by_country', 'Country', (14, 6), draw_bars,
+              (top_countries, 'Top 10 Countries by Number of Cyber Incidents', 'Incident Count')),
+        Chart('financial_loss_by_industry', 'Target Industry', (12, 6), draw_bars,
+              (industry_agg, 'Top 10 Industries by Financial Loss', 'Total Financial Loss (Million $)')),
+        Chart('resolution_time_by_defense', 'Defense Mechanism Used', (14, 6), draw_box,
+              (mechanism_stats, 'Resolution Time by Defense Mechanism', 'Defense Mechanism Used', RESOLUTION_TIME)),
+        Chart('attack_types', 'Attack Type', (12, 6), draw_bars,
+              (attack_counts, 'Top 10 Most Common Attack Types', 'count')),
+    ]
+
+
+# Draw one chart on an off-screen figure (no pyplot, so no GUI backend) and save it
+def render_chart(chart, path):
+    fig = Figure(figsize=chart.figsize)
+    chart.draw(fig.subplots(), *chart.args)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+# Render (chart, path) jobs, spread over worker processes in chunks
+def render_charts(jobs, workers=None):
+    workers = workers or os.cpu_count()
+    for path in {os.path.dirname(path) for _, path in jobs}:
+        os.makedirs(path, exist_ok=True)
+    if workers == 1 or len(jobs) <= 1:
+        return [render_chart(chart, path) for chart, path in jobs]
+    charts, paths = zip(*jobs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_chart, charts, paths, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def show_charts(charts):
+    for chart in charts:
+        fig, ax = plt.subplots(figsize=chart.figsize)
+        chart.draw(ax, *chart.args)
+        fig.tight_layout()
+        plt.show()
+
+
+def file_name(value):
+    return re.sub(r'[^\w.-]+', '_', str(value)).strip('_') or '_'
+
+
+# Command line; without --output-dir the charts are shown interactively as before
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Global cybersecurity threat dashboard")
+    parser.add_argument("batches", nargs="*", help="new incident CSV batches to ingest (each file is ingested once)")
+    parser.add_argument("--output-dir", default=None, help="render the charts headless into this directory")
+    parser.add_argument("--format", default="png", choices=["png", "svg"], help="image format for --output-dir")
+    parser.add_argument("--pack", default=None, choices=DIMENSIONS,
+                        help="also render a report pack of the charts for every value of this dimension")
+    parser.add_argument("--workers", type=int, default=None, help="rendering processes (default: CPU count)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_arguments(sys.argv[1:])
+    for path in [csv_path] + args.batches:
+        cube = append_batch(path)
+
+    charts = chart_specs(cube)
+    if args.output_dir is None:
+        show_charts(charts)
+        return
+
+    jobs = [(chart, os.path.join(args.output_dir, '%s.%s' % (chart.name, args.format))) for chart in charts]
+    if args.pack is not None:
+        for value in cube.levels[DIMENSIONS.index(args.pack)]:
+            pack_dir = os.path.join(args.output_dir, file_name(args.pack), file_name(value))
+            jobs += [(chart, os.path.join(pack_dir, '%s.%s' % (chart.name, args.format)))
+                     for chart in chart_specs(cube, {args.pack: [value]}) if chart.dimension != args.pack]
+    paths = render_charts(jobs, args.workers)
+    print("Wrote %d charts to %s" % (len(paths), args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,529 @@
 import pandas as pd
+import numpy as np
+import os
 import sys
+from itertools import product, combinations
+from collections import namedtuple
 
 # Load the CSV file
-file_path = r'C:\Users\[USER]\Downloads\user.csv'  # Update with your file path
-df = pd.read_csv(file_path)
+file_path = r'C:\Users\[USER]\Downloads\user.csv'  # Update with your file path (or pass it as the first argument)
+
+# Direct identifiers, always dropped
+direct_identifiers = ['user_id', 'name']
+
+# Files larger than this are processed in chunks of CHUNK_SIZE rows instead of being loaded whole
+CHUNKED_FILE_SIZE = 1 * 1024**3
+CHUNK_SIZE = 1_000_000
+
+# Suppression budget: fraction of the rows that may have cells suppressed or be removed to reach k
+MAX_SUPPRESSION = 0.05
 
 # Generalize 'age' to age ranges, including ages under 20
 age_bins = [0, 19, 29, 39, 49, float('inf')]
 age_labels = ['0-19', '20-29', '30-39', '40-49', '50+']
-df['age'] = pd.cut(df['age'], bins=age_bins, labels=age_labels, right=True)
-
-# Suppress the last two digits of the 'zip_code'
-df['zip_code'] = df['zip_code'].astype(str).str[:3] + '**'
 
 # Generalize 'salary' to salary ranges
 salary_bins = [0, 50000, 60000, 70000, 80000, float('inf')]
 salary_labels = ['<50K', '50K-60K', '60K-70K', '70K-80K', '80K+']
-df['salary'] = pd.cut(df['salary'], bins=salary_bins, labels=salary_labels, right=False)
 
-# Drop direct identifiers like 'user_id' and 'name'
-df.drop(columns=['user_id', 'name'], inplace=True)
+# Fixed global recoding: the same bins for every row (columns that are not in df are skipped)
+def generalize(df):
+    df = df.copy()
+    if 'age' in df:
+        df['age'] = pd.cut(df['age'], bins=age_bins, labels=age_labels, right=True)
 
-# Prompt the user for the k value
-try:
-    k = int(input("Enter the value of k for k-anonymity (e.g., 2): "))
-    if k < 1:
-        print("k must be a positive integer.")
-        sys.exit(1)
-except ValueError:
-    print("Invalid input. Please enter a positive integer for k.")
-    sys.exit(1)
+    # Suppress the last two digits of the 'zip_code'
+    if 'zip_code' in df:
+        df['zip_code'] = df['zip_code'].astype(str).str[:3] + '**'
+
+    if 'salary' in df:
+        df['salary'] = pd.cut(df['salary'], bins=salary_bins, labels=salary_labels, right=False)
+    return df
+
+# The fixed generalization of the columns that are not quasi-identifiers, for the lattice and Mondrian
+# methods: they only recode the quasi-identifiers, but e.g. a salary column is still written in bins
+def generalize_other_columns(df, quasi_identifiers):
+    df = df.copy()
+    other_columns = [column for column in df.columns if column not in quasi_identifiers]
+    df[other_columns] = generalize(df[other_columns])
+    return df
+
+# Out-of-core pass 1: equivalence-class counts of the generalized quasi-identifiers of a CSV file
+# Only the quasi-identifier columns are read, chunk by chunk; the per-chunk counts are merged into one
+# Series indexed by class, so memory is bounded by the number of distinct classes, not rows.
+# With a sensitive attribute the classes are counted per sensitive value (for GroupCountCache.class_privacy).
+def count_classes_chunked(path, quasi_identifiers, chunksize=CHUNK_SIZE, sensitive_attribute=None):
+    columns = list(quasi_identifiers) + ([sensitive_attribute] if sensitive_attribute is not None else [])
+    class_counts = None
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+        chunk_counts = generalize(chunk).groupby(columns, observed=True).size()
+        class_counts = chunk_counts if class_counts is None else class_counts.add(chunk_counts, fill_value=0)
+    return class_counts.astype(np.int64)
+
+# Out-of-core pass 2: write the generalized rows chunk by chunk (without direct identifiers and drop_columns)
+# A suppression plan (see plan_suppression) is applied to every chunk as well.
+def write_anonymized_chunked(path, output_path, drop_columns=(), chunksize=CHUNK_SIZE, suppression_plan=None):
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize)):
+        chunk = generalize(chunk.drop(columns=direct_identifiers + list(drop_columns), errors='ignore'))
+        if suppression_plan is not None:
+            chunk = apply_suppression(chunk, suppression_plan)
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+# Apply a hierarchy level to the non-missing values only: a missing value keeps NaN as its label at
+# every level below full suppression (one bucket of its own, as with the fixed bins), which keeps the
+# levels nested
+def keep_missing(generalize_level):
+    def generalize_known(values):
+        values = pd.Series(values)
+        labels = pd.Series(np.nan, index=values.index, dtype=object)
+        known = values.notna()
+        labels[known] = np.asarray(generalize_level(values[known]), dtype=object)
+        return labels
+    return generalize_known
+
+# Generalization hierarchies for the lattice search
+# For each quasi-identifier, functions mapping the distinct raw values to their labels at level 1, 2, ...
+# (level 0 is the raw value). Every level must be a coarsening of the level below it. Quasi-identifiers
+# without a hierarchy (e.g. 'gender') can only be kept or fully suppressed ('*').
+GENERALIZATION_HIERARCHIES = {
+    'age': [
+        keep_missing(lambda age: (np.floor(age) // 5 * 5).astype(int).astype(str) + '-' + (np.floor(age) // 5 * 5 + 4).astype(int).astype(str)),
+        keep_missing(lambda age: pd.cut(np.floor(age), bins=age_bins, labels=age_labels, right=True, include_lowest=True)),
+        keep_missing(lambda age: np.where(age < 40, '0-39', '40+')),
+        lambda age: np.full(len(age), '*'),
+    ],
+    'zip_code': [
+        keep_missing(lambda zip_code: zip_code.astype(str).str[:4] + '*'),
+        keep_missing(lambda zip_code: zip_code.astype(str).str[:3] + '**'),
+        keep_missing(lambda zip_code: zip_code.astype(str).str[:1] + '****'),
+        lambda zip_code: np.full(len(zip_code), '*****'),
+    ],
+    'salary': [
+        keep_missing(lambda salary: (salary // 5000 * 5).astype(int).astype(str) + 'K-' + (salary // 5000 * 5 + 5).astype(int).astype(str) + 'K'),
+        keep_missing(lambda salary: pd.cut(salary, bins=salary_bins, labels=salary_labels, right=False)),
+        keep_missing(lambda salary: np.where(salary < 60000, '<60K', '60K+')),
+        lambda salary: np.full(len(salary), '*'),
+    ],
+}
+SUPPRESSION_HIERARCHY = [lambda values: np.full(len(values), '*')]
+
+LatticeResult = namedtuple("LatticeResult", ["levels", "discernibility", "num_classes", "nodes_evaluated"])
+
+# Merge equivalence classes that share the same codes (a tuple of code columns), summing their counts
+# Classes are keyed by their mixed-radix code: a dense bincount when the key space is small, a sort
+# otherwise (np.unique over the rows when the key would overflow).
+def aggregate_classes(codes, counts, cardinalities):
+    num_keys = np.prod(cardinalities, dtype=float)
+    if num_keys <= max(4 * len(counts), 2**20):
+        key_counts = np.bincount(np.ravel_multi_index(codes, cardinalities), weights=counts, minlength=int(num_keys))
+        keys = np.flatnonzero(key_counts)
+        return np.unravel_index(keys, cardinalities), key_counts[keys].astype(np.int64)
+    if num_keys < 2**62:
+        _, first, inverse = np.unique(np.ravel_multi_index(codes, cardinalities), return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(np.column_stack(codes), axis=0, return_index=True, return_inverse=True)
+    return tuple(column[first] for column in codes), np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+
+# Class id (0..number of classes - 1) of every row of code columns
+def class_ids(codes, cardinalities):
+    if np.prod(cardinalities, dtype=float) < 2**62:
+        return np.unique(np.ravel_multi_index(codes, cardinalities), return_inverse=True)[1]
+    return np.unique(np.column_stack(codes), axis=0, return_inverse=True)[1].ravel()
+
+# Full-domain generalization lattice over the quasi-identifiers (Incognito/Flash-style search)
+# A node is a tuple with one generalization level per quasi-identifier. Each quasi-identifier is
+# factorized once into the finest class table; the equivalence classes of any node are rolled up from
+# the smallest cached table below it, so the rows are never re-scanned after construction.
+class GeneralizationLattice:
+    def __init__(self, df, quasi_identifiers, hierarchies=GENERALIZATION_HIERARCHIES):
+        self.quasi_identifiers = list(quasi_identifiers)
+        self.row_codes = []     # per QI: level-0 code of every row
+        self.level_codes = []   # per QI and level: code of every distinct raw value
+        self.level_labels = []  # per QI and level: label of every code
+        self.parent_maps = []   # per QI and level: code at this level -> code one level up
+
+        for qi in self.quasi_identifiers:
+            row_codes, uniques = pd.factorize(df[qi], use_na_sentinel=False)
+            uniques = pd.Series(uniques)
+            codes, labels, parent_maps = [np.arange(len(uniques))], [uniques.to_numpy()], []
+            for level, generalize_level in enumerate(hierarchies.get(qi, SUPPRESSION_HIERARCHY), start=1):
+                level_codes, level_labels = pd.factorize(pd.Series(generalize_level(uniques)), use_na_sentinel=False)
+                parent_map = np.zeros(len(labels[-1]), dtype=np.int64)
+                parent_map[codes[-1]] = level_codes
+                if not np.array_equal(parent_map[codes[-1]], level_codes):
+                    raise ValueError(f"Generalization hierarchy for '{qi}' is not nested at level {level}.")
+                codes.append(level_codes)
+                labels.append(np.asarray(level_labels))
+                parent_maps.append(parent_map)
+            self.row_codes.append(row_codes)
+            self.level_codes.append(codes)
+            self.level_labels.append(labels)
+            self.parent_maps.append(parent_maps)
+
+        self.heights = [len(codes) for codes in self.level_codes]
+        self.dims = tuple(range(len(self.quasi_identifiers)))
+        self.bottom = (0,) * len(self.dims)
+        self.bottom_table = aggregate_classes(tuple(self.row_codes), np.ones(len(df)),
+                                              self._cardinalities(self.dims, self.bottom))
+        self.tables = {}
+
+    def _cardinalities(self, dims, node):
+        return [len(self.level_labels[i][level]) for i, level in zip(dims, node)]
+
+    # Equivalence classes (code columns, counts) of a node over the quasi-identifiers dims (default: all of them)
+    # Rolled up from the smallest cached table below the node, or from the finest class table.
+    def class_counts(self, node, dims=None):
+        dims = self.dims if dims is None else tuple(dims)
+        node = tuple(node)
+        if (dims, node) in self.tables:
+            return self.tables[dims, node]
 
-# Prompt the user for quasi-identifiers
-available_columns = list(df.columns)
-print("\nAvailable columns for quasi-identifiers:")
-print(", ".join(available_columns))
+        lower_nodes = [lower for cached_dims, lower in self.tables
+                       if cached_dims == dims and all(low <= level for low, level in zip(lower, node))]
+        if lower_nodes:
+            lower = min(lower_nodes, key=lambda lower: len(self.tables[dims, lower][1]))
+            codes, counts = self.tables[dims, lower]
+        else:
+            lower = (0,) * len(dims)
+            codes, counts = self.bottom_table
+            codes = tuple(codes[i] for i in dims)
+
+        codes = list(codes)
+        for column, (i, low, level) in enumerate(zip(dims, lower, node)):
+            for step in range(low, level):
+                codes[column] = self.parent_maps[i][step][codes[column]]
+        self.tables[dims, node] = aggregate_classes(tuple(codes), counts, self._cardinalities(dims, node))
+        return self.tables[dims, node]
+
+    # Bottom-up breadth-first search of the lattice over dims; returns the best k-anonymous node and the
+    # failing nodes. Monotonicity prunes the lattice: every node above a k-anonymous node is k-anonymous,
+    # every node below a failing node fails, and (Incognito's subset property) a node fails when its
+    # projection onto fewer quasi-identifiers failed. Since the discernibility can only grow when
+    # generalizing, only nodes evaluated as k-anonymous (the minimal ones) need their loss computed.
+    def _search_dims(self, dims, k, failing_subsets):
+        heights = [self.heights[i] for i in dims]
+        nodes = sorted(product(*(range(height) for height in heights)), key=sum)
+        anonymous, failing = {}, set()
+        best, nodes_evaluated, current_height = None, 0, 0
+        self.tables = {}
+        for node in nodes:
+            if sum(node) > current_height:
+                current_height = sum(node)
+                # Only the class tables one level below the current height are still needed
+                self.tables = {key: table for key, table in self.tables.items() if sum(key[1]) >= current_height - 1}
+            if node in anonymous:
+                continue
+            if any(node[:j] + node[j + 1:] in failing_subsets.get(dims[:j] + dims[j + 1:], ()) for j in range(len(dims))):
+                failing.add(node)
+                continue
+
+            _, counts = self.class_counts(node, dims)
+            nodes_evaluated += 1
+            if counts.min() >= k:
+                for above in product(*(range(level, height) for level, height in zip(node, heights))):
+                    anonymous[above] = True
+                discernibility = int(np.dot(counts, counts))
+                if best is None or (discernibility, sum(node)) < (best.discernibility, sum(best.levels.values())):
+                    best = LatticeResult({self.quasi_identifiers[i]: level for i, level in zip(dims, node)},
+                                         discernibility, len(counts), 0)
+            else:
+                failing.update(product(*(range(level + 1) for level in node)))
+        return best, failing, nodes_evaluated
+
+    # Search for the k-anonymous generalization with the lowest discernibility (sum of squared class sizes)
+    # The lattices of all smaller quasi-identifier subsets are searched first (Apriori order) so that
+    # their failing nodes prune the larger lattices.
+    def search(self, k):
+        failing_subsets, nodes_evaluated = {}, 0
+        for size in range(1, len(self.dims) + 1):
+            for dims in combinations(self.dims, size):
+                best, failing_subsets[dims], evaluated = self._search_dims(dims, k, failing_subsets)
+                nodes_evaluated += evaluated
+        self.tables = {}
+        return best._replace(nodes_evaluated=nodes_evaluated) if best else None
+
+    # Apply a node's generalization levels ({qi: level}) to the rows of df
+    def generalize(self, df, levels):
+        df = df.copy()
+        for i, qi in enumerate(self.quasi_identifiers):
+            level = levels[qi]
+            if level:
+                df[qi] = self.level_labels[i][level][self.level_codes[i][level][self.row_codes[i]]]
+        return df
+
+# Mondrian multidimensional partitioning (strict, top-down)
+# Every partition is split at the median of its widest quasi-identifier (range normalized by the global
+# range), falling back to the next widest one when the median split would leave fewer than k rows on a
+# side, until no partition can be split; each partition is then generalized to its own ranges.
+# The partitions of one depth are split together: for every quasi-identifier the rows are kept in an
+# order that is grouped by partition and sorted by that quasi-identifier within each partition, so the
+# ranges are positional lookups, the split points a binary search per partition, and a split a stable
+# O(N) reordering (no per-row Python).
+# Missing numeric values are placed one global range above the largest value: they sort last, a
+# partition that mixes them with known values counts as the widest one, and they are split off into
+# partitions of their own whenever there are at least k of them.
+def mondrian_partition(df, quasi_identifiers, k):
+    values = []
+    for qi in quasi_identifiers:
+        if pd.api.types.is_numeric_dtype(df[qi]):
+            column = df[qi].to_numpy(dtype=float)
+            missing = np.isnan(column)
+            if missing.any():
+                known = column[~missing]
+                low, high = (known.min(), known.max()) if known.size else (0.0, 0.0)
+                column = np.where(missing, high + max(high - low, 1.0), column)
+            values.append(column)
+        else:
+            values.append(pd.factorize(df[qi], sort=True)[0].astype(float))
+    num_rows = len(df)
+    index_type = np.int32 if num_rows < 2**31 else np.int64  # halves the memory traffic of the reorders
+    positions = np.arange(num_rows, dtype=index_type)
+    orders = [np.argsort(column, kind='stable').astype(index_type) for column in values]
+    global_ranges = np.array([np.ptp(column) if num_rows else 0.0 for column in values])
+    global_ranges[global_ranges == 0] = 1.0
+
+    starts = np.zeros(1 if num_rows else 0, dtype=np.int64)
+    finished = np.zeros(len(starts), dtype=bool)
+    while True:
+        ends = np.append(starts[1:], num_rows)
+        finished |= ends - starts < 2 * k
+        active = np.flatnonzero(~finished)
+        if not len(active):
+            break
+        active_starts, active_ends = starts[active], ends[active]
+        median = (active_starts + active_ends) // 2
+
+        # Split position and normalized width of every active partition on every quasi-identifier
+        splits = np.zeros((len(values), len(active)), dtype=np.int64)
+        widths = np.full((len(values), len(active)), -np.inf)
+        for j, (column, order) in enumerate(zip(values, orders)):
+            median_value = column[order[median]]
+            # Strict split: at the start or the end of the run of values equal to the median
+            lower = first_position(column, order, active_starts, median, lambda v: v >= median_value)
+            upper = first_position(column, order, median, active_ends, lambda v: v > median_value)
+            lower_ok = (lower - active_starts >= k) & (active_ends - lower >= k)
+            upper_ok = (upper - active_starts >= k) & (active_ends - upper >= k)
+            splits[j] = np.where(lower_ok & (~upper_ok | (median - lower <= upper - median)), lower, upper)
+            width = (column[order[active_ends - 1]] - column[order[active_starts]]) / global_ranges[j]
+            widths[j] = np.where(lower_ok | upper_ok, width, -np.inf)
+
+        dimension = np.argmax(widths, axis=0)
+        splitting = np.isfinite(widths[dimension, np.arange(len(active))])
+        finished[active[~splitting]] = True
+        if not splitting.any():
+            break
+        split_segments = active[splitting]
+        split_dimension = dimension[splitting]
+        split = splits[split_dimension, np.flatnonzero(splitting)]
+
+        # Rows that go to the left half of a splitting partition, marked from the order they are split on
+        is_left = np.zeros(num_rows, dtype=bool)
+        for j, order in enumerate(orders):
+            chosen = split_dimension == j
+            if chosen.any():
+                is_left[order[concatenated_ranges(starts[split_segments[chosen]], split[chosen])]] = True
+
+        # Stable reorder of every quasi-identifier's order: left rows first within each partition
+        left_counts = np.zeros(len(starts), dtype=index_type)
+        left_counts[split_segments] = split - starts[split_segments]
+        segment = np.repeat(np.arange(len(starts)), ends - starts)
+        segment_starts = starts.astype(index_type)[segment]
+        segment_left_counts = left_counts[segment]
+        segment_offsets = (np.cumsum(left_counts, dtype=index_type) - left_counts)[segment]
+        for j, order in enumerate(orders):
+            flags = is_left[order]
+            left_before = np.cumsum(flags, dtype=index_type)
+            left_before -= flags
+            left_before -= segment_offsets
+            destination = np.where(flags, segment_starts + left_before, positions + segment_left_counts - left_before)
+            reordered = np.empty_like(order)
+            reordered[destination] = order
+            orders[j] = reordered
+
+        insert_at = np.searchsorted(starts, split)
+        starts = np.insert(starts, insert_at, split)
+        finished = np.insert(finished, insert_at, False)
+
+    partition = np.empty(num_rows, dtype=np.int64)
+    partition[orders[0]] = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, num_rows)))
+    return partition, starts, orders
+
+# Positions start..stop-1 of every range, concatenated
+def concatenated_ranges(starts, stops):
+    lengths = stops - starts
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+# Vectorized binary search: for each partition, the first position in [low, high) of its sorted order
+# where condition(value) holds (high if none); condition must be monotone along the order
+def first_position(column, order, low, high, condition):
+    low, high = low.copy(), high.copy()
+    searching = low < high
+    while searching.any():
+        middle = (low + high) // 2
+        holds = condition(column[order[np.minimum(middle, len(order) - 1)]])
+        high = np.where(searching & holds, middle, high)
+        low = np.where(searching & ~holds, middle + 1, low)
+        searching = low < high
+    return low
+
+# Anonymize df with Mondrian partitioning; returns the anonymized copy and the partition sizes
+# Numeric quasi-identifiers become 'min-max' ranges ('|missing' appended when the partition has missing
+# values, 'missing' when it has nothing else), others the '|'-joined categories in their range.
+def mondrian_anonymize(df, quasi_identifiers, k):
+    partition, starts, orders = mondrian_partition(df, quasi_identifiers, k)
+    ends = np.append(starts[1:], len(df)) - 1
+    df = df.copy()
+    for qi, order in zip(quasi_identifiers, orders):
+        column = df[qi]
+        if pd.api.types.is_numeric_dtype(column):
+            low, high = column.to_numpy()[order[starts]], column.to_numpy()[order[ends]]
+            if column.isna().any():
+                # Missing values sort last: the range of the known values comes from a groupby instead
+                grouped = column.groupby(partition)
+                low, high = grouped.min().to_numpy(), grouped.max().to_numpy()
+                has_missing = column.isna().groupby(partition).any().to_numpy()
+            else:
+                has_missing = np.zeros(len(starts), dtype=bool)
+            low_labels, high_labels = pd.Series(low).astype(str), pd.Series(high).astype(str)
+            labels = low_labels.where(low == high, low_labels + '-' + high_labels)
+            labels = labels.where(~has_missing, labels + '|missing').where(~np.isnan(low), 'missing').to_numpy()
+        else:
+            codes, categories = pd.factorize(column, sort=True)
+            ranges, range_codes = np.unique(np.column_stack([codes[order[starts]], codes[order[ends]]]), axis=0,
+                                            return_inverse=True)
+            range_labels = np.array(['|'.join(map(str, categories[low:high + 1])) for low, high in ranges], dtype=object)
+            labels = range_labels[range_codes.ravel()]
+        label_codes, label_values = pd.factorize(labels)
+        df[qi] = pd.Categorical.from_codes(label_codes[partition], label_values)
+    return df, np.diff(np.append(starts, len(df)))
 
-quasi_identifiers_input = input("\nEnter the quasi-identifiers as a comma-separated list (e.g., age,gender,zip_code): ")
-quasi_identifiers = [qi.strip() for qi in quasi_identifiers_input.split(",")]
+# Equivalence-class counts for any subset of the quasi-identifiers from a single pass over the rows
+# The quasi-identifiers are factorized once and the finest class table is counted once; every subset
+# (drop one, drop two, re-check after a drop, ...) is then a marginal of the smallest cached table that
+# contains it, memoized per subset. Rows with a missing value in a subset's column are left out of that
+# subset's groups, like groupby does.
+# With a sensitive attribute, its codes are one more column of the finest table, so the per-class
+# histograms for l-diversity and t-closeness come from the same pass as the k counts.
+# df can also be a table of distinct classes with their counts (e.g. from count_classes_chunked):
+#     GroupCountCache(class_counts.index.to_frame(index=False), quasi_identifiers, class_counts.to_numpy())
+class GroupCountCache:
+    def __init__(self, df, quasi_identifiers, counts=None, sensitive_attribute=None):
+        self.quasi_identifiers = list(quasi_identifiers)
+        if sensitive_attribute in self.quasi_identifiers:
+            raise ValueError(f"The sensitive attribute '{sensitive_attribute}' cannot also be a quasi-identifier.")
+        self.sensitive_attribute = sensitive_attribute
+        self.columns = self.quasi_identifiers + ([sensitive_attribute] if sensitive_attribute is not None else [])
+        self.uniques, self.missing_codes, codes = [], [], []
+        for column in self.columns:
+            column_codes, uniques = pd.factorize(df[column], sort=True, use_na_sentinel=False)
+            codes.append(column_codes)
+            self.uniques.append(uniques)
+            self.missing_codes.append(np.flatnonzero(pd.isna(uniques)))
+        self.cardinalities = [len(uniques) for uniques in self.uniques]
+        if sensitive_attribute is not None:
+            # Numeric or ordered categorical values use the ordered distance for t-closeness
+            sensitive = df[sensitive_attribute]
+            self.sensitive_ordered = (pd.api.types.is_numeric_dtype(sensitive)
+                                      or (isinstance(sensitive.dtype, pd.CategoricalDtype) and sensitive.cat.ordered))
+        all_columns = tuple(range(len(self.columns)))
+        weights = np.ones(len(df)) if counts is None else np.asarray(counts, dtype=float)
+        self.tables = {all_columns: aggregate_classes(tuple(codes), weights, self.cardinalities)}
 
-# Validate quasi-identifiers
-invalid_qis = [qi for qi in quasi_identifiers if qi not in available_columns]
-if invalid_qis:
-    print(f"The following quasi-identifiers are not valid columns: {', '.join(invalid_qis)}")
-    sys.exit(1)
+    # Class table (code columns, counts) over the given columns, in cache column order
+    def class_counts(self, columns):
+        columns = tuple(sorted(self.columns.index(column) for column in columns))
+        if columns not in self.tables:
+            superset = min((cached for cached in self.tables if set(columns) <= set(cached)),
+                           key=lambda cached: len(self.tables[cached][1]))
+            codes, counts = self.tables[superset]
+            self.tables[columns] = aggregate_classes(tuple(codes[superset.index(column)] for column in columns), counts,
+                                                     [self.cardinalities[column] for column in columns])
+        return self.tables[columns]
+
+    # Code columns of a class table in the requested column order, without the rows that have a
+    # missing quasi-identifier
+    def _requested_codes(self, columns):
+        codes, counts = self.class_counts(columns)
+        cached_columns = sorted(self.columns.index(column) for column in columns)
+        codes = [codes[cached_columns.index(self.columns.index(column))] for column in columns]
+        keep = np.ones(len(counts), dtype=bool)
+        for column, column_codes in zip(columns, codes):
+            if column != self.sensitive_attribute:
+                keep &= ~np.isin(column_codes, self.missing_codes[self.columns.index(column)])
+        return [column_codes[keep] for column_codes in codes], counts[keep]
+
+    def _class_index(self, quasi_identifiers, codes):
+        labels = [self.uniques[self.columns.index(qi)].take(qi_codes) for qi, qi_codes in zip(quasi_identifiers, codes)]
+        if len(labels) == 1:
+            return pd.Index(labels[0], name=quasi_identifiers[0])
+        return pd.MultiIndex.from_arrays(labels, names=quasi_identifiers)
+
+    # Group sizes over the quasi-identifiers, as df.groupby(quasi_identifiers, observed=True).size() would give
+    def group_sizes(self, quasi_identifiers):
+        codes, counts = self._requested_codes(quasi_identifiers)
+        order = np.lexsort(codes[::-1])
+        return pd.Series(counts[order], index=self._class_index(quasi_identifiers, [qi_codes[order] for qi_codes in codes]))
+
+    # Per-class size, distinct and entropy l-diversity, and t-closeness (EMD to the overall distribution)
+    # of the sensitive attribute, vectorized over the class x sensitive value table
+    # The EMD uses the ordered distance for numeric/ordered values and the equal distance otherwise.
+    def class_privacy(self, quasi_identifiers):
+        if self.sensitive_attribute is None:
+            raise ValueError("GroupCountCache was built without a sensitive attribute.")
+        codes, counts = self._requested_codes(list(quasi_identifiers) + [self.sensitive_attribute])
+        order = np.lexsort(codes[::-1])
+        codes, counts = [column_codes[order] for column_codes in codes], counts[order]
+        qi_codes, sensitive = codes[:-1], codes[-1]
+
+        # Rows are sorted by class, then by sensitive value: classes are contiguous runs
+        new_class = np.zeros(len(counts), dtype=bool)
+        new_class[:1] = True
+        for column_codes in qi_codes:
+            new_class[1:] |= column_codes[1:] != column_codes[:-1]
+        starts = np.flatnonzero(new_class)
+        class_id = np.cumsum(new_class) - 1
+        sizes = np.add.reduceat(counts, starts)
+        p = counts / sizes[class_id]
+        q = np.bincount(sensitive, weights=counts, minlength=self.cardinalities[-1]) / counts.sum()
+        entropy = -np.add.reduceat(p * np.log(p), starts)
+
+        num_values = len(q)
+        if num_values < 2:
+            emd = np.zeros(len(starts))
+        elif self.sensitive_ordered:
+            # EMD = sum over ranks i < m-1 of |P_class(<= i) - Q(<= i)| / (m-1). Between two consecutive
+            # values of a class P is constant, so each such range is summed in closed form from the
+            # prefix sums of Q's CDF, split where Q's CDF crosses P.
+            q_cdf = np.cumsum(q)
+            q_cdf_sums = np.concatenate([[0.0], np.cumsum(q_cdf)])
+            p_cdf = np.cumsum(p)
+            p_cdf -= (p_cdf - p)[starts][class_id]
+            last_in_class = np.append(new_class[1:], True)
+            low = sensitive
+            high = np.where(last_in_class, num_values - 1, np.append(sensitive[1:], 0))
+            split = np.clip(np.searchsorted(q_cdf, p_cdf, side='right'), low, high)
+            ranges = (p_cdf * (split - low) - (q_cdf_sums[split] - q_cdf_sums[low])
+                      + (q_cdf_sums[high] - q_cdf_sums[split]) - p_cdf * (high - split))
+            below_first = q_cdf_sums[sensitive[starts]]  # ranks before the class's first value, where P = 0
+            emd = (below_first + np.add.reduceat(ranges, starts)) / (num_values - 1)
+        else:
+            emd = 0.5 * (np.add.reduceat(np.abs(p - q[sensitive]), starts) + 1 - np.add.reduceat(q[sensitive], starts))
+
+        return pd.DataFrame({
+            "size": sizes.astype(np.int64),
+            "distinct_l": np.diff(np.append(starts, len(counts))),
+            "entropy_l": np.exp(entropy),
+            "t": emd,
+        }, index=self._class_index(quasi_identifiers, [column_codes[starts] for column_codes in qi_codes]))
 
 # Function to check for k-anonymity and provide recommendations
-def check_k_anonymity(df, quasi_identifiers, k):
+# All group counts come from one GroupCountCache (pass it in to reuse it across checks).
+def check_k_anonymity(df, quasi_identifiers, k, cache=None):
+    if cache is None:
+        cache = GroupCountCache(df, quasi_identifiers)
+
     # Group by the quasi-identifiers and consider only observed combinations
-    group_sizes = df.groupby(quasi_identifiers, observed=True).size()
+    group_sizes = cache.group_sizes(quasi_identifiers)
 
     # Filter out groups with count less than k
     less_than_k = group_sizes[group_sizes < k]
@@ -68,7 +543,7 @@ def check_k_anonymity(df, quasi_identifiers, k):
         # Suggest removing quasi-identifiers one by one
         for qi in quasi_identifiers:
             temp_qi = [q for q in quasi_identifiers if q != qi]
-            temp_group_sizes = df.groupby(temp_qi, observed=True).size()
+            temp_group_sizes = cache.group_sizes(temp_qi) if temp_qi else pd.Series(dtype=np.int64)
             if temp_group_sizes.min() >= k:
                 recommendations.append(f"- Try removing quasi-identifier '{qi}'.")
 
@@ -87,26 +562,248 @@ def check_k_anonymity(df, quasi_identifiers, k):
 
         return False, recommendations  # Return recommendations
 
-# Check k-anonymity
-is_k_anonymous, recommendations = check_k_anonymity(df, quasi_identifiers, k)
-
-# Optional: Apply recommendations
-if not is_k_anonymous:
-    # Here you can prompt the user to decide whether to apply any recommendations
-    apply_changes = input("\nWould you like to apply any recommendations? (yes/no): ").strip().lower()
-    if apply_changes == 'yes':
-        # For simplicity, let's assume we remove 'gender' if recommended
-        if any("gender" in rec for rec in recommendations):
-            df.drop(columns=['gender'], inplace=True)
-            quasi_identifiers = [qi for qi in quasi_identifiers if qi != 'gender']
-            # Re-check k-anonymity
-            is_k_anonymous, recommendations = check_k_anonymity(df, quasi_identifiers, k)
-            print(f"\nAfter applying recommendations, is the dataset {k}-anonymous? {is_k_anonymous}")
+# Function to check l-diversity and t-closeness of the sensitive attribute within each equivalence class
+# l is checked on the number of distinct sensitive values, or on exp(entropy) with entropy=True.
+def check_l_diversity_t_closeness(cache, quasi_identifiers, l=None, t=None, entropy=False):
+    metrics = cache.class_privacy(quasi_identifiers)
+    is_l_diverse = is_t_close = None
+
+    if l is not None:
+        diversity = metrics["entropy_l" if entropy else "distinct_l"]
+        less_than_l = metrics[diversity < l - 1e-9]
+        is_l_diverse = len(less_than_l) == 0
+        kind = "entropy " if entropy else ""
+        if is_l_diverse:
+            print(f"\nThe dataset is {kind}{l}-diverse on '{cache.sensitive_attribute}'.")
+        else:
+            print(f"\nThe dataset is NOT {kind}{l}-diverse on '{cache.sensitive_attribute}'. "
+                  f"{len(less_than_l)} combinations have fewer than {l} {kind}distinct values:")
+            print(less_than_l)
+
+    if t is not None:
+        farther_than_t = metrics[metrics["t"] > t]
+        is_t_close = len(farther_than_t) == 0
+        if is_t_close:
+            print(f"\nThe dataset is {t}-close on '{cache.sensitive_attribute}' (largest distance {metrics['t'].max():.3f}).")
+        else:
+            print(f"\nThe dataset is NOT {t}-close on '{cache.sensitive_attribute}'. "
+                  f"{len(farther_than_t)} combinations are farther than {t} from the overall distribution:")
+            print(farther_than_t)
+
+    return is_l_diverse, is_t_close, metrics
+
+SuppressionPlan = namedtuple("SuppressionPlan", [
+    "quasi_identifiers", "classes", "suppressed_cells", "suppressed_rows", "removed_rows", "discernibility"
+])
+
+# Cell-level suppression optimizer (local suppression, greedy)
+# Only rows of classes smaller than k are touched. For 1, 2, ... suppressed quasi-identifiers, the
+# suppression pattern whose merged classes ('*' in the suppressed columns) bring the most rows to k is
+# applied to those rows, and again until no pattern of that size helps; rows still in classes smaller than
+# k at the end are removed. Every candidate is a marginal of the small classes in the cached class table
+# (no pass over the rows). Returns None when the rows touched would exceed max_suppression of the table.
+# The discernibility counts every class as its size squared and every removed row as the table size.
+def plan_suppression(cache, quasi_identifiers, k, max_suppression=MAX_SUPPRESSION):
+    codes, counts = cache._requested_codes(quasi_identifiers)
+    cardinalities = [cache.cardinalities[cache.columns.index(qi)] for qi in quasi_identifiers]
+    num_rows = counts.sum()
+    small = counts < k
+    discernibility = np.dot(counts[~small], counts[~small])
+    small_codes, small_counts = [qi_codes[small] for qi_codes in codes], counts[small]
+
+    suppressed = np.full(len(small_counts), -1)  # index into patterns, -1 while unresolved
+    patterns, suppressed_cells = [], 0
+    for size in range(1, len(quasi_identifiers) + 1):
+        candidates = list(combinations(range(len(quasi_identifiers)), size))
+        while candidates:
+            unresolved = np.flatnonzero(suppressed < 0)
+            best = None
+            for pattern in candidates:
+                kept = [i for i in range(len(quasi_identifiers)) if i not in pattern]
+                if kept:
+                    merged = class_ids(tuple(small_codes[i][unresolved] for i in kept), [cardinalities[i] for i in kept])
+                else:
+                    merged = np.zeros(len(unresolved), dtype=np.int64)
+                merged_sizes = np.bincount(merged, weights=small_counts[unresolved])
+                resolved = merged_sizes[merged] >= k
+                resolved_rows = small_counts[unresolved][resolved].sum()
+                if resolved_rows and (best is None or resolved_rows > best[1]):
+                    best = (pattern, resolved_rows, unresolved[resolved], merged_sizes[merged_sizes >= k])
+            if best is None:
+                break
+            pattern, resolved_rows, resolved, merged_sizes = best
+            suppressed[resolved] = len(patterns)
+            patterns.append(','.join(quasi_identifiers[i] for i in pattern))
+            suppressed_cells += int(resolved_rows) * len(pattern)
+            discernibility += np.dot(merged_sizes, merged_sizes)
+            candidates.remove(pattern)
+
+    removed = suppressed < 0
+    removed_rows = int(small_counts[removed].sum())
+    suppressed_rows = int(small_counts[~removed].sum())
+    if suppressed_rows + removed_rows > max_suppression * num_rows:
+        return None
+
+    classes = cache._class_index(quasi_identifiers, small_codes).to_frame(index=False)
+    classes['suppressed'] = np.array(patterns + [None], dtype=object)[suppressed]
+    classes['removed'] = removed
+    return SuppressionPlan(list(quasi_identifiers), classes, suppressed_cells, suppressed_rows, removed_rows,
+                           int(discernibility + removed_rows * num_rows))
+
+# Apply a suppression plan to (generalized) rows: '*' in the suppressed cells, removed rows dropped
+# Rows are matched to the planned classes with one hash join on the quasi-identifiers.
+def apply_suppression(df, plan):
+    matched = df[plan.quasi_identifiers].merge(plan.classes, on=plan.quasi_identifiers, how='left')
+    df = df.copy()
+    for pattern in matched['suppressed'].dropna().unique():
+        rows = (matched['suppressed'] == pattern).to_numpy()
+        for qi in pattern.split(','):
+            if isinstance(df[qi].dtype, pd.CategoricalDtype):
+                if '*' not in df[qi].cat.categories:
+                    df[qi] = df[qi].cat.add_categories('*')
+            else:
+                df[qi] = df[qi].astype(object)
+            df.loc[rows, qi] = '*'
+    return df[~matched['removed'].fillna(False).to_numpy(dtype=bool)]
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else file_path
+    chunked = os.path.getsize(path) > CHUNKED_FILE_SIZE
+
+    if chunked:
+        # Too large to load: only the header now, the rows are streamed later
+        df = None
+        available_columns = [column for column in pd.read_csv(path, nrows=0).columns if column not in direct_identifiers]
+    else:
+        df = pd.read_csv(path)
+
+        # Drop direct identifiers like 'user_id' and 'name'
+        df.drop(columns=direct_identifiers, inplace=True)
+        available_columns = list(df.columns)
+
+    # Prompt the user for the k value
+    try:
+        k = int(input("Enter the value of k for k-anonymity (e.g., 2): "))
+        if k < 1:
+            print("k must be a positive integer.")
+            sys.exit(1)
+    except ValueError:
+        print("Invalid input. Please enter a positive integer for k.")
+        sys.exit(1)
+
+    # Prompt the user for quasi-identifiers
+    print("\nAvailable columns for quasi-identifiers:")
+    print(", ".join(available_columns))
+
+    quasi_identifiers_input = input("\nEnter the quasi-identifiers as a comma-separated list (e.g., age,gender,zip_code): ")
+    quasi_identifiers = [qi.strip() for qi in quasi_identifiers_input.split(",")]
+
+    # Validate quasi-identifiers
+    invalid_qis = [qi for qi in quasi_identifiers if qi not in available_columns]
+    if invalid_qis:
+        print(f"The following quasi-identifiers are not valid columns: {', '.join(invalid_qis)}")
+        sys.exit(1)
+
+    # Optional sensitive attribute for the l-diversity and t-closeness checks
+    sensitive_attribute = input("\nEnter the sensitive attribute for l-diversity and t-closeness (e.g., salary), "
+                                "or leave blank: ").strip() or None
+    l = t = None
+    if sensitive_attribute is not None:
+        if sensitive_attribute not in available_columns or sensitive_attribute in quasi_identifiers:
+            print(f"'{sensitive_attribute}' must be a column that is not a quasi-identifier.")
+            sys.exit(1)
+        try:
+            l = int(input("Enter the value of l for l-diversity (e.g., 2): "))
+            t = float(input("Enter the value of t for t-closeness (e.g., 0.2): "))
+        except ValueError:
+            print("Invalid input. Enter an integer for l and a number for t.")
+            sys.exit(1)
+
+    # Fixed bins, optimal lattice search or per-partition ranges (Mondrian)
+    if chunked:
+        print(f"\nLarge file: processing it in chunks of {CHUNK_SIZE:,} rows with the fixed generalization.")
+        method = 'fixed'
+    else:
+        method = input("\nChoose the generalization method (fixed, lattice or mondrian): ").strip().lower()
+    dropped_columns = []
+    cache = suppression_plan = None
+    if method == 'mondrian':
+        df, partition_sizes = mondrian_anonymize(df, quasi_identifiers, k)
+        if len(partition_sizes) and partition_sizes.min() < k:
+            print(f"\nThe dataset has fewer than {k} records and cannot be made {k}-anonymous.")
+            sys.exit(1)
+        print(f"\nMondrian partitions: {len(partition_sizes)}, discernibility: {int(np.dot(partition_sizes, partition_sizes)):,}")
+        df = generalize_other_columns(df, quasi_identifiers)
+    elif method == 'lattice':
+        lattice = GeneralizationLattice(df, quasi_identifiers)
+        result = lattice.search(k)
+        if result is None:
+            print(f"\nNo generalization makes the dataset {k}-anonymous (fewer than {k} records).")
+            sys.exit(1)
+        print(f"\nOptimal generalization levels: {result.levels}")
+        print(f"Equivalence classes: {result.num_classes}, discernibility: {result.discernibility:,} "
+              f"({result.nodes_evaluated} lattice nodes evaluated)")
+        df = generalize_other_columns(lattice.generalize(df, result.levels), quasi_identifiers)
+    else:
+        # Check k-anonymity (the group counts are computed once and shared by every check below)
+        if chunked:
+            class_counts = count_classes_chunked(path, quasi_identifiers, sensitive_attribute=sensitive_attribute)
+            cache = GroupCountCache(class_counts.index.to_frame(index=False), quasi_identifiers, class_counts.to_numpy(),
+                                    sensitive_attribute)
         else:
-            print("No applicable recommendations to automatically apply.")
+            df = generalize(df)
+            cache = GroupCountCache(df, quasi_identifiers, sensitive_attribute=sensitive_attribute)
+        is_k_anonymous, recommendations = check_k_anonymity(df, quasi_identifiers, k, cache)
+
+        # Reach k automatically by suppressing cells in the small classes, within the suppression budget
+        if not is_k_anonymous:
+            suppression_plan = plan_suppression(cache, quasi_identifiers, k, MAX_SUPPRESSION)
+            if suppression_plan is None:
+                print(f"\nReaching {k}-anonymity by suppression would touch more than {MAX_SUPPRESSION:.0%} of the rows.")
+            else:
+                print(f"\nSuppressed {suppression_plan.suppressed_cells:,} cells in {suppression_plan.suppressed_rows:,} rows "
+                      f"and removed {suppression_plan.removed_rows:,} rows to reach {k}-anonymity "
+                      f"(discernibility: {suppression_plan.discernibility:,}).")
+                is_k_anonymous = True
+                # The l-diversity / t-closeness check below needs the suppressed classes
+                if df is not None:
+                    df = apply_suppression(df, suppression_plan)
+                    cache = None
+                elif sensitive_attribute is not None:
+                    classes = apply_suppression(class_counts.rename('count').reset_index(), suppression_plan)
+                    cache = GroupCountCache(classes, quasi_identifiers, classes['count'], sensitive_attribute)
+
+        # Optional: Apply recommendations
+        if not is_k_anonymous:
+            # Here you can prompt the user to decide whether to apply any recommendations
+            apply_changes = input("\nWould you like to apply any recommendations? (yes/no): ").strip().lower()
+            if apply_changes == 'yes':
+                # For simplicity, let's assume we remove 'gender' if recommended
+                if any("gender" in rec for rec in recommendations):
+                    dropped_columns.append('gender')
+                    if df is not None:
+                        df.drop(columns=['gender'], inplace=True)
+                    quasi_identifiers = [qi for qi in quasi_identifiers if qi != 'gender']
+                    # Re-check k-anonymity
+                    is_k_anonymous, recommendations = check_k_anonymity(df, quasi_identifiers, k, cache)
+                    print(f"\nAfter applying recommendations, is the dataset {k}-anonymous? {is_k_anonymous}")
+                else:
+                    print("No applicable recommendations to automatically apply.")
+            else:
+                print("No changes applied.")
+
+    # l-diversity and t-closeness, from the same class table as the k counts
+    if sensitive_attribute is not None:
+        if cache is None:
+            cache = GroupCountCache(df, quasi_identifiers, sensitive_attribute=sensitive_attribute)
+        check_l_diversity_t_closeness(cache, quasi_identifiers, l, t)
+
+    # Output the anonymized data and k-anonymity result
+    if chunked:
+        write_anonymized_chunked(path, 'anonymized_users.csv', dropped_columns, suppression_plan=suppression_plan)
     else:
-        print("No changes applied.")
+        df.to_csv('anonymized_users.csv', index=False)
+    print("\nAnonymized data saved to 'anonymized_users.csv'.")
 
-# Output the anonymized data and k-anonymity result
-df.to_csv('anonymized_users.csv', index=False)
-print("\nAnonymized data saved to 'anonymized_users.csv'.")
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,295 @@
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 from collections import namedtuple
+from functools import partial
+from contextlib import nullcontext
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from monte_carlo_sampling import (
+    SAMPLING_MODES, normal_ppf, draw_uniforms, tilt_probabilities, relative_precision, QuantileSketch
+)
+
+# Number of component x trial cells drawn per batch
+BATCH_CELLS = 2**22
+
+# Trials per batch in adaptive mode (the precision is checked after every batch)
+ADAPTIVE_BATCH_SIZE = 1000
+
+# Registry of supported delay distributions
+# Each entry lists the required parameters, optional parameters with defaults, a sampler
+# called as sampler(rng, params, size) with a NumPy Generator and, where a closed form exists,
+# the inverse CDF ppf(params, u) used by the antithetic and Latin hypercube modes.
+# Samplers accept parameter arrays (one value per draw), so every component using the same
+# distribution is sampled in a single NumPy call.
+Distribution = namedtuple("Distribution", ["required", "defaults", "sampler", "ppf"])
+
+DISTRIBUTIONS = {
+    "normal": Distribution(
+        ("mean", "std"), {},
+        lambda rng, p, size: rng.normal(p["mean"], p["std"], size),
+        lambda p, u: p["mean"] + p["std"] * normal_ppf(u)),
+    "uniform": Distribution(
+        ("low", "high"), {},
+        lambda rng, p, size: rng.uniform(p["low"], p["high"], size),
+        lambda p, u: p["low"] + (p["high"] - p["low"]) * u),
+    "exponential": Distribution(
+        ("scale",), {},
+        lambda rng, p, size: rng.exponential(p["scale"], size),
+        lambda p, u: -p["scale"] * np.log1p(-u)),
+    "poisson": Distribution(
+        ("lam",), {},
+        lambda rng, p, size: rng.poisson(p["lam"], size),
+        None),
+    "gamma": Distribution(
+        ("shape", "scale"), {},
+        lambda rng, p, size: rng.gamma(p["shape"], p["scale"], size),
+        None),
+    "beta": Distribution(
+        ("a", "b"), {},
+        lambda rng, p, size: rng.beta(p["a"], p["b"], size),
+        None),
+    "lognormal": Distribution(
+        ("mean", "sigma"), {},
+        lambda rng, p, size: rng.lognormal(p["mean"], p["sigma"], size),
+        lambda p, u: np.exp(p["mean"] + p["sigma"] * normal_ppf(u))),
+    "weibull": Distribution(
+        ("a",), {"scale": 1},
+        lambda rng, p, size: rng.weibull(p["a"], size) * p["scale"],
+        lambda p, u: p["scale"] * (-np.log1p(-u)) ** (1 / p["a"])),
+}
+
+# Look up a distribution and resolve its parameters (defaults filled in)
+def resolve_distribution(distribution, params):
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unsupported distribution: '{distribution}'.")
+    entry = DISTRIBUTIONS[distribution]
+    missing = [name for name in entry.required if name not in params]
+    if missing:
+        raise KeyError(f"Missing parameter '{missing[0]}' for distribution '{distribution}'.")
+    resolved = {name: params.get(name, default) for name, default in entry.defaults.items()}
+    resolved.update({name: params[name] for name in entry.required})
+    return entry, resolved
 
 # Function to generate delay based on specified distribution and parameters
-def generate_delay(distribution, params):
+# Passing size returns an array of draws instead of a single value
+def generate_delay(distribution, params, size=None, rng=None):
+    entry, resolved = resolve_distribution(distribution, params)
+    if rng is None:
+        rng = np.random.default_rng()
     try:
-        if distribution == "normal":
-            return np.random.normal(params["mean"], params["std"])
-        elif distribution == "uniform":
-            return np.random.uniform(params["low"], params["high"])
-        elif distribution == "exponential":
-            return np.random.exponential(params["scale"])
-        elif distribution == "poisson":
-            return np.random.poisson(params["lam"])
-        elif distribution == "gamma":
-            return np.random.gamma(params["shape"], params["scale"])
-        elif distribution == "beta":
-            return np.random.beta(params["a"], params["b"])
-        elif distribution == "lognormal":
-            return np.random.lognormal(params["mean"], params["sigma"])
-        elif distribution == "weibull":
-            return np.random.weibull(params["a"]) * params.get("scale", 1)
-        else:
-            raise ValueError(f"Unsupported distribution: '{distribution}'.")
-    except KeyError as e:
-        raise KeyError(f"Missing parameter '{e.args[0]}' for distribution '{distribution}'.") from e
+        return entry.sampler(rng, resolved, size)
     except Exception as e:
         raise ValueError(f"Error generating delay for distribution '{distribution}': {e}") from e
 
-# Main Monte Carlo function with multiple distribution options and error handling
-def run_monte_carlo_multi_dist(
-    num_simulations=10000,
-    material_config={"distribution": "normal", "params": {"mean": 3.0, "std": 0.5}, "probability": 0.3},
-    weather_config={"distribution": "normal", "params": {"mean": 2.0, "std": 0.3}, "probability": 0.25},
-    labor_config={"distribution": "normal", "params": {"mean": 1.5, "std": 0.2}, "probability": 0.2}
-):
-    total_delays = []
+# Validate the component configs once per run and group them by distribution
+# Returns the occurrence probabilities and, per distribution name, the component rows and their parameter arrays
+CompiledComponents = namedtuple("CompiledComponents", ["probabilities", "groups"])
+
+def compile_components(components):
+    components = list(components)
+    if not components:
+        raise ValueError("At least one risk component is required.")
+
+    probabilities = np.empty(len(components))
+    grouped = {}
+    for i, config in enumerate(components):
+        probability = config["probability"]
+        if not 0 <= probability <= 1:
+            raise ValueError(f"Probability for component {i} must be between 0 and 1, got {probability}.")
+        probabilities[i] = probability
+        entry, resolved = resolve_distribution(config["distribution"], config["params"])
+        rows, params = grouped.setdefault(config["distribution"], ([], {name: [] for name in resolved}))
+        rows.append(i)
+        for name, value in resolved.items():
+            params[name].append(value)
+
+    groups = [
+        (np.array(rows), distribution, {name: np.array(values) for name, values in params.items()})
+        for distribution, (rows, params) in grouped.items()
+    ]
+    return CompiledComponents(probabilities, groups)
+
+# Log likelihood ratio of each trial's occurrence pattern under the original vs. tilted probabilities
+def importance_log_weights(probabilities, tilted, occurred):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_occurred = np.where(probabilities > 0, np.log(probabilities / tilted), 0.0)
+        log_missed = np.where(probabilities < 1, np.log((1 - probabilities) / (1 - tilted)), 0.0)
+    return (log_occurred - log_missed) @ occurred + log_missed.sum()
+
+# Simulate one batch of trials as a component x trial matrix
+# Delays are only drawn for the (component, trial) cells where the risk occurred.
+# Antithetic and LHS delays use the distribution's inverse CDF; poisson, gamma and beta have none
+# and are sampled directly (only their occurrence draws are then stratified or paired).
+# Returns the total delays and the importance weights (None unless sampling="importance").
+def simulate_delay_batch(compiled, batch_size, rng, sampling="crude", importance_boost=2.0):
+    shape = (compiled.probabilities.shape[0], batch_size)
+    weights = None
+    if sampling == "importance":
+        tilted = tilt_probabilities(compiled.probabilities, importance_boost)
+        occurred = rng.random(shape) < tilted[:, None]
+        weights = np.exp(importance_log_weights(compiled.probabilities, tilted, occurred))
+    else:
+        occurred = draw_uniforms(rng, shape, sampling) < compiled.probabilities[:, None]
+    stratified = sampling in ("antithetic", "lhs")
+    if stratified:
+        delay_uniforms = draw_uniforms(rng, shape, sampling)
+    total_delays = np.zeros(batch_size)
+
+    for rows, distribution, params in compiled.groups:
+        component, trial = np.nonzero(occurred[rows])
+        if trial.size:
+            entry = DISTRIBUTIONS[distribution]
+            component_params = {name: values[component] for name, values in params.items()}
+            if stratified and entry.ppf is not None:
+                draws = entry.ppf(component_params, delay_uniforms[rows[component], trial])
+            else:
+                draws = entry.sampler(rng, component_params, trial.size)
+            total_delays += np.bincount(trial, weights=draws, minlength=batch_size)
+
+    return total_delays, weights
+
+# Yield the simulated (total delays, weights) batch by batch
+# Batches are independent replications (an antithetic pair or LHS design never spans two),
+# which is what the confidence intervals on the percentiles are computed from.
+def iter_delay_batches(compiled, num_simulations, rng, batch_size=None, sampling="crude",
+                       importance_boost=2.0, replications=20):
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Unsupported sampling mode: '{sampling}' (use one of {', '.join(SAMPLING_MODES)}).")
+    # Batches are sized so that the component x trial matrix stays around BATCH_CELLS cells,
+    # and so that there are at least `replications` of them
+    if batch_size is None:
+        batch_size = max(1, min(BATCH_CELLS // compiled.probabilities.shape[0], -(-num_simulations // replications)))
+    for start in range(0, num_simulations, batch_size):
+        yield simulate_delay_batch(compiled, min(batch_size, num_simulations - start), rng, sampling, importance_boost)
+
+SimulationResults = namedtuple("SimulationResults", [
+    "average_delay", "std_dev_delay", "within_one_std", "within_two_std", "within_three_std",
+    "percentile_90", "percentile_95", "percentile_99",
+    "percentile_90_ci", "percentile_95_ci", "percentile_99_ci",
+    "num_simulations", "relative_precision"
+], defaults=(None, None, None, None, None))
+
+PERCENTILES = [90, 95, 99]
+
+# Percentiles of total delays, weighted when importance weights are given
+def delay_percentiles(total_delays, weights=None):
+    if weights is None:
+        return np.percentile(total_delays, PERCENTILES)
+    order = np.argsort(total_delays)
+    cumulative = np.cumsum(weights[order])
+    positions = np.searchsorted(cumulative, np.array(PERCENTILES) / 100 * cumulative[-1])
+    return total_delays[order][np.minimum(positions, total_delays.size - 1)]
+
+# Confidence intervals for the pooled percentiles from the spread of the per-batch estimates
+def percentile_confidence_intervals(percentiles, batch_percentiles, confidence=0.95):
+    batch_percentiles = np.asarray(batch_percentiles)
+    if len(batch_percentiles) < 2:
+        return [(np.nan, np.nan)] * len(percentiles)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_widths = z * batch_percentiles.std(axis=0, ddof=1) / np.sqrt(len(batch_percentiles))
+    return [(value - half_width, value + half_width) for value, half_width in zip(percentiles, half_widths)]
+
+# Summary statistics over an in-memory array of total delays
+def summarize_delays(total_delays, weights=None, batch_percentiles=()):
+    average_delay = np.average(total_delays, weights=weights)
+    std_dev_delay = np.sqrt(np.average((total_delays - average_delay) ** 2, weights=weights))
+    delay_90th_percentile, delay_95th_percentile, delay_99th_percentile = delay_percentiles(total_delays, weights)
+
+    within_one_std = np.average((average_delay - std_dev_delay <= total_delays) & (total_delays <= average_delay + std_dev_delay), weights=weights) * 100
+    within_two_std = np.average((average_delay - 2 * std_dev_delay <= total_delays) & (total_delays <= average_delay + 2 * std_dev_delay), weights=weights) * 100
+    within_three_std = np.average((average_delay - 3 * std_dev_delay <= total_delays) & (total_delays <= average_delay + 3 * std_dev_delay), weights=weights) * 100
+
+    percentiles = [delay_90th_percentile, delay_95th_percentile, delay_99th_percentile]
+    return SimulationResults(
+        average_delay, std_dev_delay, within_one_std, within_two_std, within_three_std,
+        *percentiles, *percentile_confidence_intervals(percentiles, batch_percentiles), total_delays.size
+    )
+
+# Running mean and variance (Chan et al. parallel update), mergeable across batches or workers
+class RunningMoments:
+    def __init__(self):
+        self.count = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    # With weights, count is the total weight (self-normalized moments)
+    def add(self, values, weights=None):
+        if len(values):
+            if weights is None:
+                weights = np.ones(len(values))
+            batch_mean = np.average(values, weights=weights)
+            self._combine(np.sum(weights), batch_mean, np.dot(weights, (values - batch_mean) ** 2))
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
 
-    for _ in range(num_simulations):
-        total_delay = 0
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
 
-        if np.random.rand() < material_config["probability"]:
-            total_delay += generate_delay(material_config["distribution"], material_config["params"])
+# Streaming summary of total delays: bounded memory, same results as summarize_delays
+# The sigma-band coverage is read from the sketch once the final mean and std are known;
+# only the per-batch means and percentiles (four values per batch) are kept for the confidence intervals.
+class DelayStatistics:
+    def __init__(self, relative_accuracy=0.005):
+        self.num_simulations = 0
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.batch_means = []
+        self.batch_percentiles = []
 
-        if np.random.rand() < weather_config["probability"]:
-            total_delay += generate_delay(weather_config["distribution"], weather_config["params"])
+    def add(self, total_delays, weights=None):
+        self.num_simulations += total_delays.size
+        self.moments.add(total_delays, weights)
+        self.sketch.add(total_delays, weights)
+        self.batch_means.append(np.average(total_delays, weights=weights))
+        self.batch_percentiles.append(delay_percentiles(total_delays, weights))
 
-        if np.random.rand() < labor_config["probability"]:
-            total_delay += generate_delay(labor_config["distribution"], labor_config["params"])
+    def merge(self, other):
+        self.num_simulations += other.num_simulations
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.batch_means.extend(other.batch_means)
+        self.batch_percentiles.extend(other.batch_percentiles)
 
-        total_delays.append(total_delay)
+    # Relative precision of the mean and the percentiles reached so far
+    def relative_precision(self, confidence=0.95):
+        estimates = np.concatenate([[self.moments.mean], self.sketch.quantile(np.array(PERCENTILES) / 100)])
+        return relative_precision(estimates, np.column_stack([self.batch_means, self.batch_percentiles]), confidence)
 
-    total_delays = np.array(total_delays)
+    def within_std(self, num_std):
+        average_delay, std_dev_delay = self.moments.mean, np.sqrt(self.moments.variance)
+        low, high = average_delay - num_std * std_dev_delay, average_delay + num_std * std_dev_delay
+        # rank(low - eps) counts the values strictly below the band
+        below_low = self.sketch.rank(np.nextafter(low, -np.inf))
+        return (self.sketch.rank(high) - below_low) / self.sketch.count * 100
 
-    # Calculate summary statistics
-    average_delay = np.mean(total_delays)
-    std_dev_delay = np.std(total_delays)
-    delay_90th_percentile = np.percentile(total_delays, 90)
-    delay_95th_percentile = np.percentile(total_delays, 95)
-    delay_99th_percentile = np.percentile(total_delays, 99)
+    def results(self):
+        percentiles = self.sketch.quantile(np.array(PERCENTILES) / 100)
+        return SimulationResults(
+            self.moments.mean, np.sqrt(self.moments.variance),
+            self.within_std(1), self.within_std(2), self.within_std(3),
+            *percentiles, *percentile_confidence_intervals(percentiles, self.batch_percentiles),
+            self.num_simulations, self.relative_precision()
+        )
 
-    within_one_std = np.mean((average_delay - std_dev_delay <= total_delays) & (total_delays <= average_delay + std_dev_delay)) * 100
-    within_two_std = np.mean((average_delay - 2 * std_dev_delay <= total_delays) & (total_delays <= average_delay + 2 * std_dev_delay)) * 100
-    within_three_std = np.mean((average_delay - 3 * std_dev_delay <= total_delays) & (total_delays <= average_delay + 3 * std_dev_delay)) * 100
+# Histogram of total delays with the summary statistics overlaid
+def plot_delay_distribution(counts, bin_edges, results):
+    (average_delay, std_dev_delay, within_one_std, within_two_std, within_three_std,
+     delay_90th_percentile, delay_95th_percentile, delay_99th_percentile) = results[:8]
 
     # Plotting with Matplotlib only
     plt.figure(figsize=(14, 8))
-    plt.hist(total_delays, bins=20, color="skyblue", edgecolor="black", alpha=0.6)
+    plt.hist(bin_edges[:-1], bins=bin_edges, weights=counts, color="skyblue", edgecolor="black", alpha=0.6)
 
     plt.axvline(average_delay, color='red', linestyle='--', linewidth=2, label=f"Average: {average_delay:.2f} weeks")
     plt.axvline(delay_90th_percentile, color='green', linestyle='--', linewidth=2, label=f"90th Percentile: {delay_90th_percentile:.2f} weeks")
@@ -95,20 +318,130 @@ def run_monte_carlo_multi_dist(
     plt.legend()
     plt.show()
 
-    SimulationResults = namedtuple("SimulationResults", [
-        "average_delay", "std_dev_delay", "within_one_std", "within_two_std", "within_three_std",
-        "percentile_90", "percentile_95", "percentile_99"
-    ])
-    
-    return SimulationResults(
-        average_delay, std_dev_delay, within_one_std, within_two_std, within_three_std,
-        delay_90th_percentile, delay_95th_percentile, delay_99th_percentile
-    )
+# Worker entry point: simulate one shard of trials with its own independent Generator
+def simulate_delay_shard(compiled, num_simulations, seed_sequence, batch_size=None, relative_accuracy=0.005,
+                         sampling="crude", importance_boost=2.0, replications=20):
+    rng = np.random.default_rng(seed_sequence)
+    statistics = DelayStatistics(relative_accuracy)
+    for total_delays, weights in iter_delay_batches(compiled, num_simulations, rng, batch_size, sampling,
+                                                    importance_boost, replications):
+        statistics.add(total_delays, weights)
+    return statistics
 
-# Run the simulation without Seaborn
-results = run_monte_carlo_multi_dist(
+# Shard trials across a process pool and merge the partial statistics in shard order
+# Each worker is seeded from SeedSequence(seed).spawn(workers), so the same seed and
+# worker count always give bit-identical results.
+def run_delay_shards(compiled, num_simulations, workers=None, seed=None, **shard_options):
+    workers = workers or os.cpu_count()
+    seed_sequences = np.random.SeedSequence(seed).spawn(workers)
+    shard_sizes = [num_simulations // workers + (i < num_simulations % workers) for i in range(workers)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shards = list(executor.map(partial(simulate_delay_shard, compiled, **shard_options), shard_sizes, seed_sequences))
+
+    statistics = shards[0]
+    for shard in shards[1:]:
+        statistics.merge(shard)
+    return statistics
+
+# Adaptive run: simulate batch after batch until the 95% confidence intervals on the mean and on every
+# reported percentile are within target_precision of the estimate (relative), or max_simulations is reached
+# At least min_batches batches are run so that the spread of the batch estimates is meaningful.
+# With workers=N each round simulates N batches in parallel; seeds are spawned round by round from
+# SeedSequence(seed), so the same seed and worker count always give the same stopping point.
+def run_adaptive(compiled, target_precision, max_simulations=10_000_000, workers=None, seed=None,
+                 batch_size=ADAPTIVE_BATCH_SIZE, min_batches=20, relative_accuracy=0.005, **shard_options):
+    seed_sequence = np.random.SeedSequence(seed)
+    statistics = DelayStatistics(relative_accuracy)
+    # Smaller batches when max_simulations cannot fit min_batches of the requested size
+    batch_size = max(1, min(batch_size, max_simulations // min_batches))
+    shard = partial(simulate_delay_shard, compiled, batch_size=batch_size, relative_accuracy=relative_accuracy,
+                    **shard_options)
+
+    with ProcessPoolExecutor(max_workers=workers) if workers else nullcontext() as executor:
+        while statistics.num_simulations < max_simulations:
+            remaining = max_simulations - statistics.num_simulations
+            num_shards = min(workers or 1, -(-remaining // batch_size))
+            shard_sizes = [min(batch_size, remaining - i * batch_size) for i in range(num_shards)]
+            seed_sequences = seed_sequence.spawn(len(shard_sizes))
+            for shard_statistics in (executor.map if workers else map)(shard, shard_sizes, seed_sequences):
+                statistics.merge(shard_statistics)
+            if (len(statistics.batch_means) >= min_batches
+                    and statistics.relative_precision() <= target_precision):
+                break
+    return statistics
+
+# Main Monte Carlo function with multiple distribution options and error handling
+# streaming=True keeps only running moments and a quantile sketch instead of every trial,
+# so memory stays at a few MB regardless of num_simulations (quantiles to within relative_accuracy)
+# workers=N shards the trials across N processes (implies streaming); seed makes runs reproducible
+# sampling selects a variance-reduction mode (see SAMPLING_MODES); the percentiles are reported with
+# 95% confidence intervals computed over at least `replications` independent batches
+# target_precision=0.01 ignores num_simulations and runs adaptively (see run_adaptive) until the mean,
+# P90, P95 and P99 are known to within +/-1%, up to max_simulations trials; the results report the
+# number of trials used and the relative precision reached
+def run_monte_carlo_multi_dist(
+    num_simulations=10000,
     material_config={"distribution": "normal", "params": {"mean": 3.0, "std": 0.5}, "probability": 0.3},
-    weather_config={"distribution": "exponential", "params": {"scale": 2.0}, "probability": 0.25},
-    labor_config={"distribution": "uniform", "params": {"low": 1.0, "high": 2.0}, "probability": 0.2}
-)
-print(results)
+    weather_config={"distribution": "normal", "params": {"mean": 2.0, "std": 0.3}, "probability": 0.25},
+    labor_config={"distribution": "normal", "params": {"mean": 1.5, "std": 0.2}, "probability": 0.2},
+    batch_size=None,
+    components=None,
+    streaming=False,
+    relative_accuracy=0.005,
+    seed=None,
+    workers=None,
+    sampling="crude",
+    importance_boost=2.0,
+    replications=20,
+    target_precision=None,
+    max_simulations=10_000_000
+):
+    # Any number of components can be passed as a list of configs; the three named ones are the default
+    if components is None:
+        components = [material_config, weather_config, labor_config]
+    compiled = compile_components(components)
+    shard_options = dict(batch_size=batch_size, relative_accuracy=relative_accuracy, sampling=sampling,
+                         importance_boost=importance_boost, replications=replications)
+
+    if target_precision is not None:
+        shard_options["batch_size"] = batch_size or ADAPTIVE_BATCH_SIZE
+        statistics = run_adaptive(compiled, target_precision, max_simulations, workers, seed,
+                                  min_batches=replications, **shard_options)
+        results = statistics.results()
+        counts, bin_edges = statistics.sketch.histogram(bins=20)
+    elif workers:
+        statistics = run_delay_shards(compiled, num_simulations, workers, seed, **shard_options)
+        results = statistics.results()
+        counts, bin_edges = statistics.sketch.histogram(bins=20)
+    elif streaming:
+        statistics = simulate_delay_shard(compiled, num_simulations, seed, **shard_options)
+        results = statistics.results()
+        counts, bin_edges = statistics.sketch.histogram(bins=20)
+    else:
+        rng = np.random.default_rng(seed)
+        total_delays = np.empty(num_simulations)
+        weights = np.empty(num_simulations) if sampling == "importance" else None
+        batch_percentiles = []
+        start = 0
+        for batch, batch_weights in iter_delay_batches(compiled, num_simulations, rng, batch_size, sampling,
+                                                       importance_boost, replications):
+            total_delays[start:start + batch.size] = batch
+            if weights is not None:
+                weights[start:start + batch.size] = batch_weights
+            batch_percentiles.append(delay_percentiles(batch, batch_weights))
+            start += batch.size
+        results = summarize_delays(total_delays, weights, batch_percentiles)
+        counts, bin_edges = np.histogram(total_delays, bins=20, weights=weights)
+
+    plot_delay_distribution(counts, bin_edges, results)
+    return results
+
+# Run the simulation without Seaborn
+if __name__ == "__main__":
+    results = run_monte_carlo_multi_dist(
+        material_config={"distribution": "normal", "params": {"mean": 3.0, "std": 0.5}, "probability": 0.3},
+        weather_config={"distribution": "exponential", "params": {"scale": 2.0}, "probability": 0.25},
+        labor_config={"distribution": "uniform", "params": {"low": 1.0, "high": 2.0}, "probability": 0.2}
+    )
+    print(results)
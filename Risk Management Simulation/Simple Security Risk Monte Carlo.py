@@ -1,7 +1,22 @@
+import os
+import sys
+import json
+import argparse
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from collections import namedtuple
+from functools import partial
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from monte_carlo_sampling import (
+    SAMPLING_MODES, normal_ppf, draw_uniforms, tilt_probabilities, relative_precision, QuantileSketch
+)
+
+# Log-normal parameters from the bounds of a 90% confidence interval
+def lognormal_parameters(lower_bound, upper_bound):
+    mean_log = np.log(lower_bound) + ((np.log(upper_bound) - np.log(lower_bound)) / 2)
+    stddev_log = (np.log(upper_bound) - np.log(lower_bound)) / 3.28971
+    return mean_log, stddev_log
 
 # Function to get risk data without dependencies initially
 def get_risk_data():
@@ -42,8 +57,7 @@ def get_risk_data():
         risk_category = input("Risk Category (e.g., External Threat, Internal Threat): ")
 
         # Calculate log-normal parameters
-        mean_log = np.log(lower_bound) + ((np.log(upper_bound) - np.log(lower_bound)) / 2)
-        stddev_log = (np.log(upper_bound) - np.log(lower_bound)) / 3.28971
+        mean_log, stddev_log = lognormal_parameters(lower_bound, upper_bound)
         
         risks.append({
             "id": risk_id,
@@ -75,6 +89,58 @@ def get_risk_data():
 
     return risks
 
+# Load a risk register from a CSV, JSON or YAML file (no prompts)
+# Each record needs id, name, probability, lower_bound and upper_bound; category and
+# dependent_risk_id are optional. JSON/YAML files hold a list of records or {"risks": [...]}.
+REGISTER_COLUMNS = ["id", "name", "probability", "lower_bound", "upper_bound"]
+
+def load_risk_register(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        records = pd.read_csv(path, dtype={"id": str, "dependent_risk_id": str}).to_dict("records")
+    elif extension in (".json", ".yaml", ".yml"):
+        with open(path, encoding="utf-8") as f:
+            if extension == ".json":
+                records = json.load(f)
+            else:
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise ImportError("Reading YAML risk registers requires PyYAML (pip install pyyaml).") from e
+                records = yaml.safe_load(f)
+        if isinstance(records, dict):
+            records = records["risks"]
+    else:
+        raise ValueError(f"Unsupported risk register format: '{extension}' (use .csv, .json or .yaml).")
+
+    risks = []
+    for record in records:
+        missing = [column for column in REGISTER_COLUMNS if column not in record]
+        if missing:
+            raise ValueError(f"Risk register {path} is missing {', '.join(missing)} for risk {record}.")
+        probability = float(record["probability"])
+        lower_bound, upper_bound = float(record["lower_bound"]), float(record["upper_bound"])
+        if not 0 <= probability <= 1:
+            raise ValueError(f"Risk {record['id']}: probability must be between 0 and 1.")
+        if not (lower_bound >= 0 and upper_bound >= lower_bound):
+            raise ValueError(f"Risk {record['id']}: upper bound must be >= lower bound, and both must be positive.")
+        dependent_risk_id = record.get("dependent_risk_id")
+        if pd.isna(dependent_risk_id) or dependent_risk_id == "":
+            dependent_risk_id = None
+        mean_log, stddev_log = lognormal_parameters(lower_bound, upper_bound)
+        risks.append({
+            "id": str(record["id"]),
+            "name": record["name"],
+            "probability": probability,
+            "lower_bound": lower_bound,
+            "upper_bound": upper_bound,
+            "category": record.get("category", ""),
+            "mean_log": mean_log,
+            "stddev_log": stddev_log,
+            "dependent_risk_id": None if dependent_risk_id is None else str(dependent_risk_id)
+        })
+    return risks
+
 # Validation function to check if probabilities and means make sense
 def validation_checks(simulation_df, expected_frequency):
     num_events = len(simulation_df[simulation_df["Total Loss"] > 0])
@@ -87,8 +153,68 @@ def export_to_csv(simulation_df, filename="simulation_results.csv"):
     simulation_df.to_csv(filename, index=False)
     print(f"Results exported to {filename}")
 
+# Export results to NumPy's binary .npy format (much faster to write and read than CSV)
+def export_to_npy(simulation_df, filename="simulation_results.npy"):
+    np.save(filename, simulation_df["Total Loss"].to_numpy())
+    print(f"Results exported to {filename}")
+
+# Quantiles of values, weighted when importance weights are given
+def weighted_quantile(values, quantiles, weights=None):
+    if weights is None:
+        return np.quantile(values, quantiles)
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    positions = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1])
+    return values[order][np.minimum(positions, values.size - 1)]
+
+# Summary statistics of the simulated total losses (weighted if the frame has a "Weight" column)
+def summarize_losses(simulation_df):
+    total_loss = simulation_df["Total Loss"].to_numpy()
+    weights = simulation_df["Weight"].to_numpy() if "Weight" in simulation_df else None
+    percentile_50, percentile_95, percentile_99 = weighted_quantile(total_loss, [0.5, 0.95, 0.99], weights)
+    return {
+        "mean_loss": np.average(total_loss, weights=weights),
+        "median_loss": percentile_50,
+        "percentile_95": percentile_95,
+        "percentile_99": percentile_99,
+        "event_frequency": np.average(total_loss > 0, weights=weights),
+    }
+
+# Tail quantiles with confidence intervals
+# The trials are split into `replications` blocks of whole simulation batches (independent
+# replications, so antithetic pairs and LHS designs stay intact) and the interval is the pooled
+# estimate +/- z * standard error of the per-block estimates.
+# The batches are read from attrs["batch_starts"] (the first trial of every batch), or cut every
+# attrs["batch_size"] trials when only that is known.
+def tail_quantiles(simulation_df, quantiles=(0.95, 0.99), replications=20, confidence=0.95):
+    total_loss = simulation_df["Total Loss"].to_numpy()
+    weights = simulation_df["Weight"].to_numpy() if "Weight" in simulation_df else None
+    batch_starts = simulation_df.attrs.get("batch_starts")
+    if batch_starts is None:
+        batch_size = simulation_df.attrs.get("batch_size", 1)
+        batch_starts = np.arange(0, len(total_loss), batch_size)
+    batches = np.searchsorted(batch_starts, np.arange(len(total_loss)), side="right") - 1
+    blocks = batches * replications // max(len(batch_starts), replications)
+    block_estimates = np.array([
+        weighted_quantile(total_loss[blocks == block], quantiles, None if weights is None else weights[blocks == block])
+        for block in np.unique(blocks)
+    ])
+
+    estimates = weighted_quantile(total_loss, quantiles, weights)
+    if len(block_estimates) < 2:
+        half_widths = np.full(len(quantiles), np.nan)
+    else:
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        half_widths = z * block_estimates.std(axis=0, ddof=1) / np.sqrt(len(block_estimates))
+    return pd.DataFrame({"Estimate": estimates, "Lower": estimates - half_widths, "Upper": estimates + half_widths},
+                        index=pd.Index(quantiles, name="Quantile"))
+
 # Visualization function for the heatmap using Seaborn
+# Plotting libraries are imported on first use so the simulation core can be imported headless
 def plot_heatmap(risks):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     data = pd.DataFrame({
         "Risk": [risk["name"] for risk in risks],
         "Probability": [risk["probability"] for risk in risks],
@@ -105,102 +231,486 @@ def plot_heatmap(risks):
     plt.ylabel("Risk")
     plt.show()
 
+# Probability added to a dependent risk, within the same trial, when the risk it depends on occurs
+DEPENDENCY_UPLIFT = 0.1
+
+# Number of risk x trial cells evaluated per batch
+BATCH_CELLS = 2**22
+
+# Trials per batch in adaptive mode (the precision is checked after every batch)
+ADAPTIVE_BATCH_SIZE = 1000
+
+# Risk register compiled to arrays, with the dependency graph resolved once
+# levels holds, in topological order, the risk rows of each level and the parent -> dependent
+# edges leaving them (parents sorted by dependent, with reduceat offsets per dependent).
+# thresholds[i, k] is the occurrence threshold of risk i when k of its parents occurred, on the
+# uniform scale or, when a correlation matrix is given, on the normal scale of the Gaussian copula
+# (cholesky is then its lower Cholesky factor).
+CompiledRisks = namedtuple("CompiledRisks", [
+    "probability", "mean_log", "stddev_log", "dependent", "levels", "thresholds", "cholesky"
+])
+
+# Occurrence probabilities for 0..max_parents occurred parents (capped where the probability reaches 1)
+def occurrence_probabilities(probability, max_parents):
+    num_uplifts = min(max_parents, int(np.ceil(1 / DEPENDENCY_UPLIFT))) + 1
+    return np.clip(probability[:, None] + DEPENDENCY_UPLIFT * np.arange(num_uplifts), 0, 1)
+
+# Occurrence thresholds for 0..max_parents occurred parents, on the uniform or copula normal scale
+def occurrence_thresholds(probability, max_parents, correlated):
+    thresholds = occurrence_probabilities(probability, max_parents)
+    if correlated:
+        # Phi(z) <= p  <=>  z <= Phi^-1(p)
+        normal = NormalDist()
+        thresholds = np.array([[-np.inf if t <= 0 else np.inf if t >= 1 else normal.inv_cdf(t) for t in row]
+                               for row in thresholds]).reshape(thresholds.shape)
+    return thresholds
+
+# Lower Cholesky factor of a risk correlation matrix, validated once per run
+def correlation_cholesky(correlation, num_risks):
+    correlation = np.asarray(correlation, dtype=float)
+    if correlation.shape != (num_risks, num_risks):
+        raise ValueError(f"Correlation matrix must be {num_risks}x{num_risks}, got {correlation.shape}.")
+    if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1):
+        raise ValueError("Correlation matrix must be symmetric with a unit diagonal.")
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError as e:
+        raise ValueError("Correlation matrix must be positive definite.") from e
+
+def compile_risks(risks, correlation=None):
+    index = {risk["id"]: i for i, risk in enumerate(risks)}  # O(1) id lookup
+    probability = np.array([risk["probability"] for risk in risks], dtype=float)
+    mean_log = np.array([risk["mean_log"] for risk in risks], dtype=float)
+    stddev_log = np.array([risk["stddev_log"] for risk in risks], dtype=float)
+    # Unknown dependency ids are ignored, as before
+    dependent = np.array([index.get(risk["dependent_risk_id"], -1) if risk["dependent_risk_id"] else -1
+                          for risk in risks], dtype=np.int64)
+
+    # Kahn's algorithm: a risk is evaluated after every risk that can raise its probability
+    num_parents = np.bincount(dependent[dependent >= 0], minlength=len(risks))
+    level = np.zeros(len(risks), dtype=np.int64)
+    ready = [i for i in range(len(risks)) if num_parents[i] == 0]
+    visited = 0
+    while ready:
+        i = ready.pop()
+        visited += 1
+        child = dependent[i]
+        if child >= 0:
+            level[child] = max(level[child], level[i] + 1)
+            num_parents[child] -= 1
+            if num_parents[child] == 0:
+                ready.append(child)
+    if visited != len(risks):
+        raise ValueError("Risk dependencies contain a cycle; dependent_risk_id links must form a DAG.")
+
+    levels = []
+    for depth in range(level.max() + 1 if len(risks) else 0):
+        rows = np.flatnonzero(level == depth)
+        parents = rows[dependent[rows] >= 0]
+        parents = parents[np.argsort(dependent[parents], kind="stable")]
+        children, offsets = np.unique(dependent[parents], return_index=True)
+        levels.append((rows, parents, children, offsets))
+
+    max_parents = int(np.bincount(dependent[dependent >= 0], minlength=1).max())
+    cholesky = None if correlation is None else correlation_cholesky(correlation, len(risks))
+    thresholds = occurrence_thresholds(probability, max_parents, cholesky is not None)
+    return CompiledRisks(probability, mean_log, stddev_log, dependent, levels, thresholds, cholesky)
+
+# Standard normals for one batch: plain draws, or the normal quantiles of stratified/antithetic uniforms,
+# correlated through the Cholesky factor when a correlation matrix is given (one matrix product)
+def draw_normals(compiled, shape, rng, sampling="crude"):
+    if sampling in ("antithetic", "lhs"):
+        normals = normal_ppf(draw_uniforms(rng, shape, sampling))
+    else:
+        normals = rng.standard_normal(shape)
+    return normals if compiled.cholesky is None else compiled.cholesky @ normals
+
+# Occurrence scores for one batch: uniforms, or correlated standard normals with a correlation matrix
+def draw_scores(compiled, batch_size, rng, sampling="crude"):
+    shape = (compiled.probability.shape[0], batch_size)
+    if compiled.cholesky is None:
+        return draw_uniforms(rng, shape, sampling)
+    return draw_normals(compiled, shape, rng, sampling)
+
+# Evaluate which risks occur in each trial, level by level in topological order
+# Each trial carries its own dependency uplift, so probabilities never leak across trials.
+# With log_ratios (log likelihood-ratio tables for occurred / not occurred, indexed like the
+# thresholds) the per-trial importance log weights are accumulated as well.
+def evaluate_occurrence(compiled, thresholds, scores, log_ratios=None):
+    occurred = np.zeros(scores.shape, dtype=bool)
+    occurred_parents = np.zeros(scores.shape, dtype=np.int32)
+    log_weights = None if log_ratios is None else np.zeros(scores.shape[1])
+    max_uplift = thresholds.shape[1] - 1
+
+    for rows, parents, children, offsets in compiled.levels:
+        uplifts = np.minimum(occurred_parents[rows], max_uplift)
+        occurred[rows] = scores[rows] <= thresholds[rows[:, None], uplifts]  # Event occurs
+        if log_ratios is not None:
+            log_occurred, log_missed = log_ratios
+            log_weights += np.where(occurred[rows], log_occurred[rows[:, None], uplifts],
+                                    log_missed[rows[:, None], uplifts]).sum(axis=0)
+        if parents.size:
+            occurred_parents[children] += np.add.reduceat(occurred[parents].astype(np.int32), offsets, axis=0)
+    return occurred, log_weights
+
+# Tilted occurrence thresholds and log likelihood-ratio tables for importance sampling
+def importance_tables(compiled, importance_boost):
+    probabilities = occurrence_probabilities(compiled.probability, compiled.thresholds.shape[1] - 1)
+    tilted = tilt_probabilities(probabilities, importance_boost)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_occurred = np.where(probabilities > 0, np.log(probabilities / tilted), 0.0)
+        log_missed = np.where(probabilities < 1, np.log((1 - probabilities) / (1 - tilted)), 0.0)
+    return tilted, (log_occurred, log_missed)
+
+# Simulate one batch of trials for all risks at once
+# With a correlation matrix, severities are correlated standard normals as well.
+# Returns the total losses and the importance weights (None unless sampling="importance").
+def simulate_loss_batch(compiled, batch_size, truncation_limit, rng, sampling="crude", importance_tables=None):
+    num_risks = compiled.probability.shape[0]
+    if sampling == "importance":
+        tilted, log_ratios = importance_tables
+        occurred, log_weights = evaluate_occurrence(compiled, tilted, draw_scores(compiled, batch_size, rng), log_ratios)
+        weights = np.exp(log_weights)
+    else:
+        occurred, weights = evaluate_occurrence(compiled, compiled.thresholds, draw_scores(compiled, batch_size, rng, sampling))
+
+    # Generate random losses based on log-normal distribution, only where events occurred
+    risk, trial = np.nonzero(occurred)
+    if compiled.cholesky is None and sampling not in ("antithetic", "lhs"):
+        severity = rng.standard_normal(risk.size)
+    else:
+        severity = draw_normals(compiled, (num_risks, batch_size), rng, sampling)[risk, trial]
+    simulated_loss = np.exp(compiled.mean_log[risk] + compiled.stddev_log[risk] * severity)
+    # Apply truncation if enabled
+    if truncation_limit is not None:
+        simulated_loss = np.minimum(simulated_loss, truncation_limit)
+    return np.bincount(trial, weights=simulated_loss, minlength=batch_size), weights
+
+# Reject unknown sampling modes, and importance sampling with correlated risks
+def check_sampling(sampling, correlation=None):
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Unsupported sampling mode: '{sampling}' (use one of {', '.join(SAMPLING_MODES)}).")
+    if sampling == "importance" and correlation is not None:
+        raise ValueError("Importance sampling is only supported for independent risks (no correlation matrix).")
+
 # Monte Carlo simulation function
-def run_simulation(risks, num_simulations, truncation_limit=None):
-    simulation_results = []
-
-    for _ in range(num_simulations):
-        total_loss = 0
-        for risk in risks:
-            if np.random.rand() <= risk["probability"]:  # Event occurs
-                # Generate random loss based on log-normal distribution
-                simulated_loss = np.exp(np.random.normal(risk["mean_log"], risk["stddev_log"]))
-                # Apply truncation if enabled
-                if truncation_limit is not None:
-                    simulated_loss = min(simulated_loss, truncation_limit)
-                # Add loss to total
-                total_loss += simulated_loss
-                # Handle dependencies
-                if risk["dependent_risk_id"]:
-                    dependent_risk = next((r for r in risks if r["id"] == risk["dependent_risk_id"]), None)
-                    if dependent_risk:
-                        dependent_risk["probability"] += 0.1  # Increase probability of dependent risk
-
-        simulation_results.append(total_loss)
+# Trials are evaluated in batches of about BATCH_CELLS risk x trial cells, and in at least
+# `replications` batches so that tail_quantiles can put confidence intervals on the result.
+# correlation is an optional risk x risk matrix (in the order of risks) for a Gaussian copula
+# sampling selects a variance-reduction mode (see SAMPLING_MODES)
+def run_simulation(risks, num_simulations, truncation_limit=None, rng=None, batch_size=None, correlation=None,
+                   sampling="crude", importance_boost=2.0, replications=20):
+    check_sampling(sampling, correlation)
+    if rng is None:
+        rng = np.random.default_rng()
+    compiled = compile_risks(risks, correlation)
+    tables = importance_tables(compiled, importance_boost) if sampling == "importance" else None
+    if batch_size is None:
+        batch_size = max(1, min(BATCH_CELLS // max(1, len(risks)), -(-num_simulations // replications)))
+
+    simulation_results = np.empty(num_simulations)
+    weights = np.empty(num_simulations) if sampling == "importance" else None
+    for start in range(0, num_simulations, batch_size):
+        stop = min(start + batch_size, num_simulations)
+        simulation_results[start:stop], batch_weights = simulate_loss_batch(
+            compiled, stop - start, truncation_limit, rng, sampling, tables)
+        if weights is not None:
+            weights[start:stop] = batch_weights
 
     simulation_df = pd.DataFrame(simulation_results, columns=["Total Loss"])
+    if weights is not None:
+        simulation_df["Weight"] = weights
+    simulation_df.attrs["batch_size"] = batch_size
+    simulation_df.attrs["batch_starts"] = list(range(0, num_simulations, batch_size))
+    return simulation_df
+
+# Adaptive Monte Carlo simulation: run batch after batch until the 95% confidence intervals on the mean
+# loss and on the tail quantiles are within target_precision of the estimate (relative), or max_simulations
+# is reached. At least min_batches batches are run so that the spread of the batch estimates is meaningful
+# (batch_size is reduced when max_simulations is too small for that);
+# the estimates are compared against the average of the batch estimates, which avoids re-sorting every
+# trial after each batch. The achieved precision is stored in simulation_df.attrs["relative_precision"].
+def run_simulation_adaptive(risks, target_precision, truncation_limit=None, rng=None, batch_size=ADAPTIVE_BATCH_SIZE,
+                            min_batches=20, max_simulations=10_000_000, quantiles=(0.95, 0.99), correlation=None,
+                            sampling="crude", importance_boost=2.0):
+    check_sampling(sampling, correlation)
+    if rng is None:
+        rng = np.random.default_rng()
+    compiled = compile_risks(risks, correlation)
+    tables = importance_tables(compiled, importance_boost) if sampling == "importance" else None
+    # Smaller batches when max_simulations cannot fit min_batches of the requested size
+    batch_size = max(1, min(batch_size, max_simulations // min_batches))
+
+    batches, batch_weights, batch_estimates = [], [], []
+    precision, num_simulations = np.inf, 0
+    while num_simulations < max_simulations:
+        losses, weights = simulate_loss_batch(compiled, min(batch_size, max_simulations - num_simulations),
+                                              truncation_limit, rng, sampling, tables)
+        batches.append(losses)
+        batch_weights.append(weights)
+        batch_estimates.append([np.average(losses, weights=weights), *weighted_quantile(losses, quantiles, weights)])
+        num_simulations += losses.size
+        if len(batch_estimates) >= min_batches:
+            precision = relative_precision(np.mean(batch_estimates, axis=0), batch_estimates)
+            if precision <= target_precision:
+                break
+    else:
+        # max_simulations reached: report the precision of the batches that did finish
+        precision = relative_precision(np.mean(batch_estimates, axis=0), batch_estimates)
+
+    simulation_df = pd.DataFrame(np.concatenate(batches), columns=["Total Loss"])
+    if sampling == "importance":
+        simulation_df["Weight"] = np.concatenate(batch_weights)
+    simulation_df.attrs["batch_size"] = batch_size
+    simulation_df.attrs["batch_starts"] = list(range(0, num_simulations, batch_size))
+    simulation_df.attrs["relative_precision"] = precision
     return simulation_df
 
+# Worker entry point: simulate one shard of trials with its own independent Generator
+def simulate_shard(risks, num_simulations, seed_sequence, **simulation_options):
+    return run_simulation(risks, num_simulations, rng=np.random.default_rng(seed_sequence), **simulation_options)
+
+# Parallel Monte Carlo: shard trials across a process pool, one Generator per worker
+# Workers are seeded from SeedSequence(seed).spawn(workers) and shards are concatenated in order,
+# so the same seed and worker count always give bit-identical results.
+# Other keyword arguments (correlation, sampling, ...) are passed on to run_simulation.
+def run_simulation_parallel(risks, num_simulations, truncation_limit=None, workers=None, seed=None,
+                            **simulation_options):
+    workers = workers or os.cpu_count()
+    seed_sequences = np.random.SeedSequence(seed).spawn(workers)
+    shard_sizes = [num_simulations // workers + (i < num_simulations % workers) for i in range(workers)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shards = list(executor.map(
+            partial(simulate_shard, risks, truncation_limit=truncation_limit, **simulation_options),
+            shard_sizes, seed_sequences
+        ))
+
+    # concat drops attrs that differ between shards; the shards' batch sizes can differ by one
+    # trial, so the batch boundaries of every shard are carried over (offset by the shard's
+    # position) and tail_quantiles never forms a batch across two shards
+    simulation_df = pd.concat(shards, ignore_index=True)
+    offsets = np.cumsum([0] + shard_sizes[:-1])
+    simulation_df.attrs = {
+        **shards[0].attrs,
+        "batch_size": max(shard.attrs["batch_size"] for shard in shards),
+        "batch_starts": [offset + start for offset, shard in zip(offsets.tolist(), shards)
+                         for start in shard.attrs["batch_starts"]],
+    }
+    return simulation_df
+
+# Probability multipliers for the named threat scenarios
+SCENARIOS = {"Normal": 1.0, "High Threat": 1.5, "Under Attack": 2.0}
+
 # Scenario analysis
 def scenario_analysis(risks, scenario="Normal"):
     for risk in risks:
-        if scenario == "High Threat":
-            risk["probability"] *= 1.5
-        elif scenario == "Under Attack":
-            risk["probability"] *= 2.0
+        risk["probability"] *= SCENARIOS.get(scenario, 1.0)
     return risks
 
+# Scenario sweep with common random numbers
+# The occurrence scores and lognormal severities are drawn once per batch and shared by every
+# scenario and truncation limit; each scenario only re-thresholds the same scores. Differences
+# between scenarios are therefore not blurred by sampling noise, and the cost is about one
+# simulation plus one comparison pass per scenario.
+# Statistics are accumulated batch by batch (loss sums, event counts and one quantile sketch per
+# scenario and limit), so memory does not grow with num_simulations; the percentiles are accurate
+# to within relative_accuracy.
+# scenarios maps names to probability multipliers (default: SCENARIOS); a truncation limit of
+# None means no truncation. Returns a (Scenario, Truncation Limit) x statistic table.
+def scenario_sweep(risks, num_simulations, scenarios=None, truncation_limits=(None,), rng=None,
+                   batch_size=None, correlation=None, relative_accuracy=0.005):
+    if rng is None:
+        rng = np.random.default_rng()
+    if scenarios is None:
+        scenarios = SCENARIOS
+    compiled = compile_risks(risks, correlation)
+    if batch_size is None:
+        batch_size = max(1, BATCH_CELLS // max(1, len(risks)))
+
+    max_parents = compiled.thresholds.shape[1] - 1
+    scenario_thresholds = [
+        occurrence_thresholds(compiled.probability * multiplier, max_parents, compiled.cholesky is not None)
+        for multiplier in scenarios.values()
+    ]
+    limits = [np.inf if limit is None else limit for limit in truncation_limits]
+    loss_sums = np.zeros((len(scenarios), len(limits)))
+    sketches = [[QuantileSketch(relative_accuracy) for _ in limits] for _ in scenarios]
+    event_counts = np.zeros(len(scenarios))
+
+    for start in range(0, num_simulations, batch_size):
+        stop = min(start + batch_size, num_simulations)
+        scores = draw_scores(compiled, stop - start, rng)
+        if compiled.cholesky is None:
+            severity = rng.standard_normal(scores.shape)
+        else:
+            severity = draw_scores(compiled, stop - start, rng)
+        losses = np.exp(compiled.mean_log[:, None] + compiled.stddev_log[:, None] * severity)
+
+        for i, thresholds in enumerate(scenario_thresholds):
+            occurred, _ = evaluate_occurrence(compiled, thresholds, scores)
+            event_counts[i] += occurred.any(axis=0).sum()
+            for j, limit in enumerate(limits):
+                total_losses = np.where(occurred, np.minimum(losses, limit), 0).sum(axis=0)
+                loss_sums[i, j] += total_losses.sum()
+                sketches[i][j].add(total_losses)
+
+    rows = []
+    for i, name in enumerate(scenarios):
+        for j, limit in enumerate(limits):
+            percentile_50, percentile_95, percentile_99 = sketches[i][j].quantile(np.array([0.5, 0.95, 0.99]))
+            rows.append({
+                "Scenario": name,
+                "Truncation Limit": limit,
+                "Mean Total Loss": loss_sums[i, j] / num_simulations,
+                "Median Total Loss": percentile_50,
+                "95th Percentile Loss": percentile_95,
+                "99th Percentile Loss": percentile_99,
+                "Event Frequency": event_counts[i] / num_simulations,
+            })
+    return pd.DataFrame(rows).set_index(["Scenario", "Truncation Limit"])
+
+# Plot distribution using Matplotlib
+def plot_loss_distribution(simulation_df, mean_loss, percentile_95, percentile_99):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.hist(simulation_df["Total Loss"], bins=50, color="skyblue", edgecolor="black")
+    plt.axvline(percentile_95, color="red", linestyle="dashed", linewidth=1, label="95th Percentile")
+    plt.axvline(percentile_99, color="orange", linestyle="dashed", linewidth=1, label="99th Percentile")
+    plt.axvline(mean_loss, color="green", linestyle="dashed", linewidth=1, label="Mean Loss")
+    plt.title("Distribution of Total Simulated Losses")
+    plt.xlabel("Total Loss ($)")
+    plt.ylabel("Frequency")
+    plt.legend()
+    plt.show()
+
+# Headless batch mode: simulate every risk register file and write one result file per register
+# Results go to output_dir as <register name>.csv (via export_to_csv) or .npy; a summary row per
+# register is returned and written to summary.csv.
+def run_batch(register_paths, output_dir, num_simulations, truncation_limit=None, scenario="Normal",
+              output_format="csv", seed=None, sampling="crude", target_precision=None):
+    if output_format not in ("csv", "npy"):
+        raise ValueError(f"Unsupported output format: '{output_format}' (use csv or npy).")
+    os.makedirs(output_dir, exist_ok=True)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(register_paths))
+
+    summary = []
+    for path, seed_sequence in zip(register_paths, seed_sequences):
+        risks = scenario_analysis(load_risk_register(path), scenario)
+        rng = np.random.default_rng(seed_sequence)
+        if target_precision is None:
+            simulation_df = run_simulation(risks, num_simulations, truncation_limit, rng, sampling=sampling)
+        else:
+            simulation_df = run_simulation_adaptive(risks, target_precision, truncation_limit, rng,
+                                                    max_simulations=num_simulations, sampling=sampling)
+
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + "." + output_format)
+        if output_format == "csv":
+            export_to_csv(simulation_df, output_path)
+        else:
+            export_to_npy(simulation_df, output_path)
+        summary.append({"register": path, "num_risks": len(risks), "num_simulations": len(simulation_df),
+                        **summarize_losses(simulation_df)})
+        if target_precision is not None:
+            summary[-1]["relative_precision"] = simulation_df.attrs["relative_precision"]
+
+    summary_df = pd.DataFrame(summary)
+    summary_df.to_csv(os.path.join(output_dir, "summary.csv"), index=False)
+    return summary_df
+
+# Command line for the batch mode; without register files the interactive program runs
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Security risk Monte Carlo simulation")
+    parser.add_argument("registers", nargs="*", help="risk register files (.csv, .json, .yaml) to run headless")
+    parser.add_argument("--simulations", type=int, default=10000,
+                        help="number of Monte Carlo trials per register (the maximum with --target-precision)")
+    parser.add_argument("--truncation-limit", type=float, default=None, help="cap on a single simulated loss ($)")
+    parser.add_argument("--scenario", default="Normal", choices=list(SCENARIOS), help="threat scenario")
+    parser.add_argument("--output-dir", default="simulation_results", help="directory for the result files")
+    parser.add_argument("--format", default="csv", choices=["csv", "npy"], help="result file format")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    parser.add_argument("--sampling", default="crude", choices=SAMPLING_MODES, help="variance-reduction mode")
+    parser.add_argument("--target-precision", type=float, default=None,
+                        help="run adaptively until mean, P95 and P99 are within this relative precision (e.g. 0.01)")
+    return parser.parse_args(argv)
+
 # Main program execution with input validation
-while True:
-    try:
-        num_simulations = int(input("Enter the number of Monte Carlo simulations to run (e.g., 10000): "))
-        break
-    except ValueError:
-        print("Invalid input. Enter an integer.")
-
-apply_truncation = input("Apply truncation to extreme values? (y/n): ").strip().lower() == 'y'
-truncation_limit = None
-if apply_truncation:
+def main():
+    target_precision = None
     while True:
+        answer = input("Enter the number of Monte Carlo simulations to run (e.g., 10000), "
+                       "or 'auto' to run until a target precision: ").strip().lower()
         try:
-            truncation_limit = float(input("Enter truncation limit (e.g., 10000000 for $10 million): "))
-            if truncation_limit >= 0:
+            if answer == "auto":
+                target_precision = float(input("Enter the target relative precision (e.g., 0.01 for +/-1%): "))
+                if target_precision <= 0:
+                    print("Target precision must be positive.")
+                    continue
                 break
-            print("Truncation limit must be positive.")
+            num_simulations = int(answer)
+            break
         except ValueError:
-            print("Invalid input. Enter a positive number.")
+            print("Invalid input. Enter an integer, or 'auto'.")
 
-# Step 1: Get risk data from user
-risks = get_risk_data()
+    apply_truncation = input("Apply truncation to extreme values? (y/n): ").strip().lower() == 'y'
+    truncation_limit = None
+    if apply_truncation:
+        while True:
+            try:
+                truncation_limit = float(input("Enter truncation limit (e.g., 10000000 for $10 million): "))
+                if truncation_limit >= 0:
+                    break
+                print("Truncation limit must be positive.")
+            except ValueError:
+                print("Invalid input. Enter a positive number.")
 
-# Step 2: Choose scenario (optional)
-scenario_choice = input("Choose a scenario (Normal, High Threat, Under Attack): ").strip()
-risks = scenario_analysis(risks, scenario_choice)
+    # Step 1: Get risk data from user
+    risks = get_risk_data()
 
-# Step 3: Run simulation with enhancements
-simulation_df = run_simulation(risks, num_simulations, truncation_limit)
+    # Step 2: Choose scenario (optional)
+    scenario_choice = input("Choose a scenario (Normal, High Threat, Under Attack): ").strip()
+    risks = scenario_analysis(risks, scenario_choice)
 
-# Step 4: Analysis and validation checks
-mean_loss = simulation_df["Total Loss"].mean()
-median_loss = simulation_df["Total Loss"].median()
-percentile_95 = simulation_df["Total Loss"].quantile(0.95)
-percentile_99 = simulation_df["Total Loss"].quantile(0.99)
+    # Step 3: Run simulation with enhancements
+    if target_precision is None:
+        simulation_df = run_simulation(risks, num_simulations, truncation_limit)
+    else:
+        simulation_df = run_simulation_adaptive(risks, target_precision, truncation_limit)
+        print(f"\nAdaptive run stopped after {len(simulation_df):,} trials "
+              f"(relative precision {simulation_df.attrs['relative_precision']:.2%}).")
 
-print("\nMonte Carlo Simulation Results:")
-print(f"Mean Total Loss: ${mean_loss:,.2f}")
-print(f"Median Total Loss: ${median_loss:,.2f}")
-print(f"95th Percentile Loss: ${percentile_95:,.2f}")
-print(f"99th Percentile Loss: ${percentile_99:,.2f}")
+    # Step 4: Analysis and validation checks
+    summary = summarize_losses(simulation_df)
+    mean_loss, median_loss = summary["mean_loss"], summary["median_loss"]
+    percentile_95, percentile_99 = summary["percentile_95"], summary["percentile_99"]
 
-# Validation
-expected_frequency = sum(r["probability"] for r in risks) / len(risks)
-validation_checks(simulation_df, expected_frequency)
+    print("\nMonte Carlo Simulation Results:")
+    print(f"Mean Total Loss: ${mean_loss:,.2f}")
+    print(f"Median Total Loss: ${median_loss:,.2f}")
+    print(f"95th Percentile Loss: ${percentile_95:,.2f}")
+    print(f"99th Percentile Loss: ${percentile_99:,.2f}")
+    for quantile, row in tail_quantiles(simulation_df).iterrows():
+        print(f"{quantile:.0%} Quantile 95% CI: ${row['Lower']:,.2f} - ${row['Upper']:,.2f}")
 
-# Export results
-export_to_csv(simulation_df)
+    # Validation
+    expected_frequency = sum(r["probability"] for r in risks) / len(risks)
+    validation_checks(simulation_df, expected_frequency)
 
-# Visualizations
-plot_heatmap(risks)
+    # Export results
+    export_to_csv(simulation_df)
 
-# Plot distribution using Matplotlib
-plt.figure(figsize=(10, 6))
-plt.hist(simulation_df["Total Loss"], bins=50, color="skyblue", edgecolor="black")
-plt.axvline(percentile_95, color="red", linestyle="dashed", linewidth=1, label="95th Percentile")
-plt.axvline(percentile_99, color="orange", linestyle="dashed", linewidth=1, label="99th Percentile")
-plt.axvline(mean_loss, color="green", linestyle="dashed", linewidth=1, label="Mean Loss")
-plt.title("Distribution of Total Simulated Losses")
-plt.xlabel("Total Loss ($)")
-plt.ylabel("Frequency")
-plt.legend()
-plt.show()
-10
+    # Visualizations
+    plot_heatmap(risks)
+
+    # Plot distribution using Matplotlib
+    plot_loss_distribution(simulation_df, mean_loss, percentile_95, percentile_99)
+
+if __name__ == "__main__":
+    arguments = parse_arguments(sys.argv[1:])
+    if arguments.registers:
+        print(run_batch(arguments.registers, arguments.output_dir, arguments.simulations,
+                        arguments.truncation_limit, arguments.scenario, arguments.format, arguments.seed,
+                        arguments.sampling, arguments.target_precision))
+    else:
+        main()
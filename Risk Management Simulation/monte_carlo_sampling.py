@@ -0,0 +1,155 @@
+import numpy as np
+from statistics import NormalDist
+
+# Sampling helpers shared by "Simple Risk Monte Carlo Simulation.py" and
+# "Simple Security Risk Monte Carlo.py" (both import this module from their own directory)
+
+# Inverse of the standard normal CDF, vectorized (Acklam's rational approximation, rel. error < 1.2e-9)
+NORMAL_PPF_A = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+                1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+NORMAL_PPF_B = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+                6.680131188771972e+01, -1.328068155288572e+01, 1.0]
+NORMAL_PPF_C = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+                -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+NORMAL_PPF_D = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+                3.754408661907416e+00, 1.0]
+
+def normal_ppf(u):
+    u = np.clip(u, np.finfo(float).tiny, 1 - np.finfo(float).epsneg)
+    tail = np.minimum(u, 1 - u)
+    q = np.sqrt(-2 * np.log(tail))
+    tail_values = np.polyval(NORMAL_PPF_C, q) / np.polyval(NORMAL_PPF_D, q)
+    r = (u - 0.5) ** 2
+    central_values = (u - 0.5) * np.polyval(NORMAL_PPF_A, r) / np.polyval(NORMAL_PPF_B, r)
+    return np.where(tail < 0.02425, np.where(u < 0.5, tail_values, -tail_values), central_values)
+
+# Variance-reduction sampling modes
+# crude: plain Monte Carlo
+# antithetic: every uniform u in a batch is paired with 1 - u
+# lhs: Latin hypercube, each row's uniforms are stratified over the trials of a batch
+# importance: occurrence odds are multiplied by importance_boost so that rare joint occurrences
+#     are oversampled; each trial carries its likelihood ratio as a weight
+SAMPLING_MODES = ("crude", "antithetic", "lhs", "importance")
+
+# Uniforms of the given (rows x trials) shape for a sampling mode
+def draw_uniforms(rng, shape, sampling="crude"):
+    if sampling == "antithetic":
+        half = rng.random((shape[0], (shape[1] + 1) // 2))
+        return np.concatenate([half, 1 - half], axis=1)[:, :shape[1]]
+    if sampling == "lhs":
+        strata = rng.permuted(np.broadcast_to(np.arange(shape[1]), shape), axis=1)
+        return (strata + rng.random(shape)) / shape[1]
+    return rng.random(shape)
+
+# Occurrence probabilities for importance sampling: odds multiplied by boost (stays below 1)
+def tilt_probabilities(probabilities, boost):
+    return boost * probabilities / (1 + (boost - 1) * probabilities)
+
+# Largest relative half-width of the confidence intervals on the given estimates (mean, quantiles, ...),
+# from the spread of the per-batch estimates; inf until there are at least two batches
+def relative_precision(estimates, batch_estimates, confidence=0.95):
+    batch_estimates = np.asarray(batch_estimates)
+    if len(batch_estimates) < 2:
+        return np.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_widths = z * batch_estimates.std(axis=0, ddof=1) / np.sqrt(len(batch_estimates))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.max(np.where(half_widths > 0, half_widths / np.abs(estimates), 0.0))
+
+# Dense bucket counts starting at an integer offset; grows as new buckets are seen
+class BucketStore:
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0)
+
+    def add(self, indices, weights=None):
+        if indices.size == 0:
+            return
+        self._add_counts(int(indices.min()), np.bincount(indices - indices.min(), weights=weights))
+
+    def merge(self, other):
+        if other.counts.size:
+            self._add_counts(other.offset, other.counts)
+
+    def _add_counts(self, offset, counts):
+        if self.counts.size == 0:
+            self.offset, self.counts = offset, counts.astype(float)
+            return
+        low = min(self.offset, offset)
+        high = max(self.offset + self.counts.size, offset + counts.size)
+        if low != self.offset or high != self.offset + self.counts.size:
+            grown = np.zeros(high - low)
+            grown[self.offset - low:self.offset - low + self.counts.size] = self.counts
+            self.offset, self.counts = low, grown
+        self.counts[offset - self.offset:offset - self.offset + counts.size] += counts
+
+# Mergeable quantile sketch with relative accuracy guarantees (DDSketch-style log buckets)
+# Values are mapped to bucket ceil(log_gamma(|x|)); negative values and zeros are kept apart.
+class QuantileSketch:
+    def __init__(self, relative_accuracy=0.005, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self.positive = BucketStore()
+        self.negative = BucketStore()
+        self.zero_count = 0.0
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _index(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+
+    def _value(self, indices):
+        return 2 * self.gamma ** indices / (self.gamma + 1)
+
+    def add(self, values, weights=None):
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        weights = np.ones(values.size) if weights is None else np.asarray(weights, dtype=float)
+        positive = values > self.min_value
+        negative = values < -self.min_value
+        zero = ~(positive | negative)
+        self.positive.add(self._index(values[positive]), weights[positive])
+        self.negative.add(self._index(-values[negative]), weights[negative])
+        self.zero_count += weights[zero].sum()
+        self.count += weights.sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    def merge(self, other):
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    # Representative value and count of every bucket, in ascending order of value
+    def buckets(self):
+        negative_values = -self._value(self.negative.offset + np.arange(self.negative.counts.size))
+        positive_values = self._value(self.positive.offset + np.arange(self.positive.counts.size))
+        values = np.concatenate([negative_values[::-1], [0.0], positive_values])
+        counts = np.concatenate([self.negative.counts[::-1], [self.zero_count], self.positive.counts])
+        return np.clip(values, self.min, self.max), counts
+
+    def quantile(self, q):
+        values, counts = self.buckets()
+        ranks = np.atleast_1d(q) * (self.count - 1)
+        result = values[np.searchsorted(np.cumsum(counts), ranks, side="right")]
+        return result if np.ndim(q) else result[0]
+
+    # Approximate number of values <= x for each x
+    def rank(self, x):
+        values, counts = self.buckets()
+        return np.concatenate([[0.0], np.cumsum(counts)])[np.searchsorted(values, x, side="right")]
+
+    # Approximate histogram of the sketched values, equivalent to np.histogram(values, bins)
+    def histogram(self, bins=20):
+        low, high = (self.min, self.max) if self.min < self.max else (self.min - 0.5, self.max + 0.5)
+        edges = np.linspace(low, high, bins + 1)
+        values, counts = self.buckets()
+        bucket_bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, bins - 1)
+        return np.bincount(bucket_bins, weights=counts, minlength=bins), edges